@@ -0,0 +1,405 @@
+import csv
+import json
+import mmap
+import os
+import struct
+from array import array
+
+from compact_graph import CompactGraph
+
+DATA_DIRECTORY = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+DEFAULT_AIRPORTS = os.path.join(DATA_DIRECTORY, "airports.csv")
+DEFAULT_ROUTES = os.path.join(DATA_DIRECTORY, "routes.csv")
+
+BINARY_MAGIC = b"AEROMAP1"
+# magic, airport count, adjacency entries, string table length, flags
+BINARY_HEADER = struct.Struct("<8sIQQI")
+WHOLE_DISTANCES = 1
+HAS_METRICS = 2
+DIRECTED = 4
+HAS_FLIGHTS = 8
+# flight slots (removed flights included, so ids survive), carrier string table length
+FLIGHTS_HEADER = struct.Struct("<QQ")
+NAN = float("nan")
+
+
+class AirportIndex:
+    # Airport code <-> name, built once per network.
+    def __init__(self, airports=()):
+        self.names = {}
+        self.codes = {}
+        for code, name in airports:
+            self.add(code, name)
+
+    def add(self, code, name):
+        code = code.strip().upper()
+        if code in self.names and self.names[code] != name:
+            raise ValueError(f"Airport code {code} is used for both {self.names[code]} and {name}")
+        if name in self.codes and self.codes[name] != code:
+            raise ValueError(f"{name} has two codes: {self.codes[name]} and {code}")
+        self.names[code] = name
+        self.codes[name] = code
+
+    def name(self, code):
+        return self.names.get(code)
+
+    def code(self, name):
+        return self.codes.get(name)
+
+    def __len__(self):
+        return len(self.names)
+
+    def validate(self, graph):
+        # Every airport in the graph needs a code and every code an airport.
+        missing = [name for name in graph.vertices if name not in self.codes]
+        unknown = [code for code, name in self.names.items() if name not in graph.vertices]
+        problems = []
+        if missing:
+            problems.append(f"airports without a code: {', '.join(missing[:10])}")
+        if unknown:
+            problems.append(f"codes without an airport: {', '.join(unknown[:10])}")
+        if problems:
+            raise ValueError("Airport index does not match the graph; " + "; ".join(problems))
+        return self
+
+
+def number(text):
+    # Blank cells are missing values; whole numbers stay ints so distances print as before.
+    if text is None or text == "":
+        return None
+    value = float(text)
+    return int(value) if value.is_integer() else value
+
+
+def coordinate(value):
+    if value is None or value == "" or value != value:
+        return None
+    return float(value)
+
+
+def read_airports_csv(path):
+    with open(path, newline="", encoding="utf-8") as handle:
+        for row in csv.DictReader(handle):
+            yield row["code"], row["name"], coordinate(row.get("latitude")), coordinate(row.get("longitude"))
+
+
+def read_routes_csv(path):
+    with open(path, newline="", encoding="utf-8") as handle:
+        for row in csv.DictReader(handle):
+            yield (row["source"], row["destination"], number(row["distance"]),
+                   number(row.get("time")), number(row.get("cost")))
+
+
+def read_json(path):
+    with open(path, encoding="utf-8") as handle:
+        document = json.load(handle)
+    airports = [(a["code"], a["name"], a.get("latitude"), a.get("longitude")) for a in document["airports"]]
+    routes = [(r["source"], r["destination"], r["distance"], r.get("time"), r.get("cost"))
+              for r in document["routes"]]
+    flights = [(f["id"], f["source"], f["destination"], f.get("carrier"), f["distance"], f["time"], f["cost"])
+               for f in document.get("flights", ())]
+    return airports, routes, flights, document.get("directed", False)
+
+
+def match_direction(graph, directed, path):
+    # An empty graph takes the saved network's direction; one that already
+    # holds airports has to match it.
+    if graph.directed != directed:
+        if graph.vertices:
+            raise ValueError(f"{path} holds a {'directed' if directed else 'undirected'} network")
+        graph.directed = directed
+
+
+def restore_flights(graph, flights):
+    # flights: (id, source, destination, carrier, distance, time, cost). The
+    # routes already hold each pair's best flight, so the flights go straight
+    # into the store; they keep their ids unless the graph already has some.
+    from flight_edges import EdgeStore
+
+    fresh = graph.edges is None
+    if fresh:
+        graph.edges = EdgeStore()
+    for edge_id, src, dest, carrier, distance, time, cost in flights:
+        if fresh:
+            graph.edges.restore(edge_id, src, dest, carrier, distance, time, cost, not graph.directed)
+        else:
+            graph.edges.add(src, dest, carrier, distance, time, cost, not graph.directed)
+
+
+def build_network(graph, airports, routes, flights=()):
+    # airports: (code, name, latitude, longitude); routes: (source, destination,
+    # distance, time, cost) and flights: (id, source, destination, carrier,
+    # distance, time, cost) with airports given by code or name.
+    index = AirportIndex()
+    vertices = []
+    for code, name, latitude, longitude in airports:
+        index.add(code, name)
+        vertices.append((name, latitude, longitude))
+
+    def resolve(airport, line):
+        name = index.name(str(airport).strip().upper())
+        if name is None and airport in index.codes:
+            name = airport
+        if name is None:
+            raise ValueError(f"Route {line} refers to unknown airport {airport!r}")
+        return name
+
+    edges = []
+    for line, (source, destination, distance, time, cost) in enumerate(routes, start=1):
+        if distance is None:
+            raise ValueError(f"Route {line} has no distance")
+        edges.append((resolve(source, line), resolve(destination, line), distance, time, cost))
+    flights = [(edge_id, resolve(source, f"flight {edge_id}"), resolve(destination, f"flight {edge_id}"),
+                carrier, distance, time, cost)
+               for edge_id, source, destination, carrier, distance, time, cost in flights]
+
+    graph.add_network(vertices, edges)
+    if flights:
+        restore_flights(graph, flights)
+    graph.airports = index.validate(graph)
+    return graph
+
+
+def load_network(graph, path=DEFAULT_AIRPORTS, routes_path=None):
+    # CSV needs the airports and routes files; .json holds both sections; any
+    # other extension is read as a binary snapshot.
+    extension = os.path.splitext(path)[1].lower()
+    if extension == ".csv":
+        if routes_path is None:
+            routes_path = DEFAULT_ROUTES if path == DEFAULT_AIRPORTS else path.replace("airports", "routes")
+        return build_network(graph, read_airports_csv(path), read_routes_csv(routes_path))
+    if extension == ".json":
+        airports, routes, flights, directed = read_json(path)
+        match_direction(graph, directed, path)
+        return build_network(graph, airports, routes, flights)
+    return load_binary(graph, path)
+
+
+def save_json(graph, path):
+    index = graph.airports
+    document = {
+        "directed": graph.directed,
+        "airports": [
+            {"code": index.code(name), "name": name,
+             "latitude": graph.coordinates.get(name, (None, None))[0],
+             "longitude": graph.coordinates.get(name, (None, None))[1]}
+            for name in graph.vertices
+        ],
+        "routes": [
+            {"source": index.code(src), "destination": index.code(dest), "distance": weight,
+             "time": time, "cost": cost}
+            for src, dest, weight, time, cost in network_routes(graph)
+        ],
+    }
+    if graph.edges:
+        document["flights"] = [
+            {"id": edge.edge_id, "source": index.code(edge.src), "destination": index.code(edge.dest),
+             "carrier": edge.carrier, "distance": edge.distance, "time": edge.time, "cost": edge.cost}
+            for edge in graph.edges.flights()
+        ]
+    with open(path, "w", encoding="utf-8") as handle:
+        json.dump(document, handle, indent=1)
+
+
+def network_routes(graph):
+    # Every route with its time and cost (None for the per-leg defaults); an
+    # undirected graph gives each airport pair once.
+    seen = set()
+    for src, connections in graph.vertices.items():
+        for dest, weight in connections.items():
+            if not graph.directed and (dest, src) in seen:
+                continue
+            seen.add((src, dest))
+            time, cost = graph.edge_metrics.get((src, dest), (None, None))
+            yield src, dest, weight, time, cost
+
+
+def save_binary(graph, path):
+    # Layout: header, then a NUL-separated "code\0name" string table padded to
+    # 8 bytes, then float64 latitudes and longitudes (NaN when unknown) and
+    # the adjacency in CSR form, as CompactGraph holds it: int64 offsets,
+    # float64 distances and, when any route has its own, float64 times and
+    # costs per entry, and last the int32 neighbours so every 8-byte section
+    # stays aligned. A graph with flights follows with its flight sections,
+    # see flight_sections.
+    compact = CompactGraph.from_graph(graph)
+    index = graph.airports
+    strings = b"\0".join(
+        f"{index.code(name) if index else ''}\0{name}".encode("utf-8") for name in compact.names)
+
+    latitudes = array("d", (graph.coordinates.get(name, (NAN, NAN))[0] for name in compact.names))
+    longitudes = array("d", (graph.coordinates.get(name, (NAN, NAN))[1] for name in compact.names))
+    sections = [latitudes, longitudes, compact.offsets, compact.weights]
+
+    flags = DIRECTED if graph.directed else 0
+    if all(float(weight).is_integer() for weight in compact.weights):
+        flags |= WHOLE_DISTANCES
+    if graph.edge_metrics:
+        flags |= HAS_METRICS
+        times, costs = array("d"), array("d")
+        for src_id, name in enumerate(compact.names):
+            for entry in range(compact.offsets[src_id], compact.offsets[src_id + 1]):
+                time, cost = graph.edge_metrics.get((name, compact.names[compact.neighbors[entry]]), (NAN, NAN))
+                times.append(time)
+                costs.append(cost)
+        sections += [times, costs]
+    sections.append(compact.neighbors)
+    if graph.edges:
+        flags |= HAS_FLIGHTS
+
+    with open(path, "wb") as handle:
+        handle.write(BINARY_HEADER.pack(BINARY_MAGIC, len(compact.names), compact.edge_count, len(strings), flags))
+        handle.write(strings)
+        handle.write(b"\0" * (-(BINARY_HEADER.size + len(strings)) % 8))
+        for section in sections:
+            handle.write(section)
+        if graph.edges:
+            handle.write(b"\0" * (-handle.tell() % 8))
+            for section in flight_sections(graph.edges, compact.ids):
+                handle.write(section)
+
+
+def flight_sections(edges, ids):
+    # The flight header, the NUL-separated carrier names padded to 8 bytes,
+    # float64 distances, times and costs per flight id, then int32 source and
+    # destination airports (-1 for a removed flight) and carrier indexes (-1
+    # for none).
+    carriers = "\0".join(edges.carrier_names).encode("utf-8")
+    sources, destinations = array("i"), array("i")
+    for src, dest in zip(edges.sources, edges.destinations):
+        sources.append(-1 if src is None else ids[src])
+        destinations.append(-1 if src is None else ids[dest])
+    return [FLIGHTS_HEADER.pack(len(sources), len(carriers)), carriers, b"\0" * (-len(carriers) % 8),
+            edges.distances, edges.times, edges.costs, sources, destinations, edges.carriers]
+
+
+def map_binary(path):
+    # Maps the snapshot read-only; the sections are memoryviews straight into
+    # the file, so nothing is copied until it is used.
+    with open(path, "rb") as handle:
+        data = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+    view = memoryview(data)
+    magic, count, entries, string_length, flags = BINARY_HEADER.unpack_from(view)
+    if magic != BINARY_MAGIC:
+        raise ValueError(f"{path} is not an AeroPathfinder network snapshot")
+
+    offset = BINARY_HEADER.size
+    strings = str(view[offset:offset + string_length], "utf-8").split("\0") if count else []
+    offset += string_length + (-(BINARY_HEADER.size + string_length) % 8)
+
+    layout = [("latitudes", "d", count), ("longitudes", "d", count), ("offsets", "q", count + 1),
+              ("weights", "d", entries)]
+    if flags & HAS_METRICS:
+        layout += [("times", "d", entries), ("costs", "d", entries)]
+    layout.append(("neighbors", "i", entries))
+    sections = {}
+    for key, typecode, length in layout:
+        size = array(typecode).itemsize * length
+        sections[key] = view[offset:offset + size].cast(typecode)
+        offset += size
+    if flags & HAS_FLIGHTS:
+        offset += -offset % 8
+        slots, carrier_length = FLIGHTS_HEADER.unpack_from(view, offset)
+        offset += FLIGHTS_HEADER.size
+        carriers = str(view[offset:offset + carrier_length], "utf-8")
+        sections["carrier_names"] = carriers.split("\0") if carrier_length else []
+        offset += carrier_length + (-carrier_length % 8)
+        for key, typecode in (("flight_distances", "d"), ("flight_times", "d"), ("flight_costs", "d"),
+                              ("flight_sources", "i"), ("flight_destinations", "i"), ("flight_carriers", "i")):
+            size = array(typecode).itemsize * slots
+            sections[key] = view[offset:offset + size].cast(typecode)
+            offset += size
+    return strings[0::2], strings[1::2], flags, sections
+
+
+def load_compact(path):
+    # A frozen CompactGraph over the mapped file: loads in milliseconds
+    # however large the network is.
+    _, names, _, sections = map_binary(path)
+    return CompactGraph(names, sections["offsets"], sections["neighbors"], sections["weights"])
+
+
+def load_binary(graph, path):
+    codes, names, flags, sections = map_binary(path)
+    match_direction(graph, bool(flags & DIRECTED), path)
+    fresh = not graph.vertices
+    offsets = sections["offsets"].tolist()
+    neighbors = [names[i] for i in sections["neighbors"].tolist()]
+    weights = sections["weights"].tolist()
+    if flags & WHOLE_DISTANCES:
+        weights = list(map(int, weights))
+
+    adjacency = {}
+    for i, name in enumerate(names):
+        start, end = offsets[i], offsets[i + 1]
+        adjacency[name] = dict(zip(neighbors[start:end], weights[start:end]))
+
+    coordinates = {}
+    for name, latitude, longitude in zip(names, sections["latitudes"].tolist(), sections["longitudes"].tolist()):
+        if latitude == latitude and longitude == longitude:
+            coordinates[name] = (latitude, longitude)
+
+    edge_metrics = {}
+    if flags & HAS_METRICS:
+        times = sections["times"].tolist()
+        costs = sections["costs"].tolist()
+        for i, name in enumerate(names):
+            for entry in range(offsets[i], offsets[i + 1]):
+                if times[entry] == times[entry]:
+                    edge_metrics[(name, neighbors[entry])] = (whole(times[entry]), whole(costs[entry]))
+
+    graph.add_adjacency(adjacency, coordinates, edge_metrics)
+    if flags & HAS_FLIGHTS:
+        carrier_names = sections["carrier_names"]
+        restore_flights(graph, [
+            (edge_id, names[src], names[dest], carrier_names[carrier] if carrier >= 0 else None,
+             whole(distance), whole(time), whole(cost))
+            for edge_id, (src, dest, carrier, distance, time, cost) in enumerate(zip(
+                sections["flight_sources"].tolist(), sections["flight_destinations"].tolist(),
+                sections["flight_carriers"].tolist(), sections["flight_distances"].tolist(),
+                sections["flight_times"].tolist(), sections["flight_costs"].tolist()))
+            if src >= 0])
+    if fresh:
+        # The mapped CSR is exactly what Graph.compact() would build.
+        graph.compact_graph = CompactGraph(names, sections["offsets"], sections["neighbors"], sections["weights"],
+                                           graph.version)
+    if any(codes):
+        graph.airports = AirportIndex(zip(codes, names)).validate(graph)
+    return graph
+
+
+def whole(value):
+    return int(value) if value.is_integer() else value
+
+
+_default_index = None
+
+
+def default_airport_index():
+    # The bundled network's codes, read once on first use.
+    global _default_index
+    if _default_index is None:
+        _default_index = AirportIndex((code, name) for code, name, _, _ in read_airports_csv(DEFAULT_AIRPORTS))
+    return _default_index
+
+
+def main():
+    import argparse
+    from flight_core import Graph
+
+    parser = argparse.ArgumentParser(description="Convert an airport network between CSV, JSON and binary snapshots.")
+    parser.add_argument("output", help="file to write; .json writes JSON, anything else a binary snapshot")
+    parser.add_argument("--input", default=DEFAULT_AIRPORTS, help="airports CSV, JSON or binary snapshot to read")
+    parser.add_argument("--routes", help="routes CSV to go with an airports CSV")
+    args = parser.parse_args()
+
+    graph = load_network(Graph(), args.input, args.routes)
+    if args.output.lower().endswith(".json"):
+        save_json(graph, args.output)
+    else:
+        save_binary(graph, args.output)
+    print(f"{args.output}: {len(graph.vertices)} airports")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,181 @@
+import heapq
+from itertools import count
+
+from pareto import edge_weights
+
+INF = float('inf')
+
+
+def reverse_tree(graph, destination, weight_of):
+    # Exact costs to the destination and the next hop towards it, searched
+    # backwards once and shared by every spur search.
+    reverse = graph.reverse_vertices()
+    to_target = {destination: 0}
+    next_hop = {destination: None}
+    priority_queue = [(0, destination)]
+
+    while priority_queue:
+        current_value, current_vertex = heapq.heappop(priority_queue)
+
+        if current_value > to_target[current_vertex]:
+            continue
+
+        for neighbor in reverse[current_vertex]:
+            value = current_value + weight_of(neighbor, current_vertex)
+
+            if value < to_target.get(neighbor, INF):
+                to_target[neighbor] = value
+                next_hop[neighbor] = current_vertex
+                heapq.heappush(priority_queue, (value, neighbor))
+
+    return to_target, next_hop
+
+
+def tree_path(next_hop, vertex):
+    path = [vertex]
+    while next_hop[path[-1]] is not None:
+        path.append(next_hop[path[-1]])
+    return path
+
+
+def spur_path(graph, weight_of, to_target, next_hop, spur, destination, blocked, removed, budget):
+    # Cheapest spur -> destination path avoiding the root (blocked) and the
+    # first hops earlier routes already took from this root (removed), as
+    # (cost, path). Gives up once every remaining path must cost more than
+    # budget, returning (that lower bound, None); None if there is no path.
+    path = tree_path(next_hop, spur)
+    if path[1] not in removed and blocked.isdisjoint(path):
+        # The unrestricted best is still allowed, so it is the answer.
+        return to_target[spur], path
+
+    # Otherwise A* guided by the unrestricted costs, which can only
+    # underestimate once vertices and edges are taken away. It stops at
+    # the first vertex whose own tree path avoids the root: from there the
+    # estimate is exact, so nothing left in the queue can beat it.
+    clean = {destination: True}
+
+    def tree_allowed(vertex):
+        trail = []
+        while vertex not in clean:
+            if vertex in blocked or vertex == spur:
+                clean[vertex] = False
+                break
+            trail.append(vertex)
+            vertex = next_hop[vertex]
+        for step in trail:
+            clean[step] = clean[vertex]
+        return clean[vertex]
+
+    vertices = graph.vertices
+    costs = {spur: 0}
+    previous = {}
+    settled = set()
+    priority_queue = [(to_target[spur], spur)]
+
+    while priority_queue:
+        estimate, current_vertex = heapq.heappop(priority_queue)
+
+        if current_vertex in settled:
+            continue
+        if estimate > budget:
+            return estimate, None
+        settled.add(current_vertex)
+
+        if current_vertex != spur and tree_allowed(current_vertex):
+            path = [current_vertex]
+            while path[-1] != spur:
+                path.append(previous[path[-1]])
+            path.reverse()
+            return estimate, path + tree_path(next_hop, current_vertex)[1:]
+
+        for neighbor in vertices[current_vertex]:
+            if neighbor in blocked or neighbor in settled or neighbor not in to_target:
+                continue
+            if current_vertex == spur and neighbor in removed:
+                continue
+            cost = costs[current_vertex] + weight_of(current_vertex, neighbor)
+
+            if cost < costs.get(neighbor, INF):
+                costs[neighbor] = cost
+                previous[neighbor] = current_vertex
+                heapq.heappush(priority_queue, (cost + to_target[neighbor], neighbor))
+
+    return None
+
+
+def spur_bound(graph, weight_of, to_target, spur, blocked, removed):
+    # A cheap lower bound on any spur path: the best allowed first hop plus
+    # the unrestricted cost from there.
+    bound = INF
+    for neighbor in graph.vertices[spur]:
+        if neighbor in blocked or neighbor in removed or neighbor not in to_target:
+            continue
+        bound = min(bound, weight_of(spur, neighbor) + to_target[neighbor])
+    return bound
+
+
+def k_shortest_paths(graph, source, destination, max_detour=None, metric="distance"):
+    # Yen's algorithm: yields (cost, path) for loopless routes, cheapest
+    # first, computing each only when the caller asks for it. With
+    # max_detour, routes costing more than max_detour times the best one
+    # are never searched for.
+    if source not in graph.vertices or destination not in graph.vertices:
+        return
+    weight_of = edge_weights(graph, metric)
+    to_target, next_hop = reverse_tree(graph, destination, weight_of)
+    if source not in to_target:
+        return
+
+    best = to_target[source]
+    limit = INF if max_detour is None else best * max_detour
+    # branches[root] holds the next hops already used after that root.
+    branches = {}
+    first = tree_path(next_hop, source)
+    seen = {tuple(first)}
+    order = count()
+    # Entries are (cost, order, path, index, root_cost). A route found in
+    # full has root_cost None and index where it left its parent. A spur
+    # not searched yet is queued under its lower bound with the route and
+    # spur index it comes from, and only searched if it reaches the front,
+    # so most spurs of a long route are never searched at all.
+    candidates = [(best, next(order), first, 0, None)]
+
+    while candidates:
+        cost, _, path, index, root_cost = heapq.heappop(candidates)
+        if cost > limit:
+            return
+
+        if root_cost is not None:
+            # The search only needs to beat the next entry in line; if it
+            # cannot, the spur goes back in under the better bound it found.
+            root = path[:index + 1]
+            budget = min(limit, candidates[0][0]) if candidates else limit
+            found = spur_path(graph, weight_of, to_target, next_hop, path[index], destination,
+                              set(root[:-1]), branches[tuple(root)], budget - root_cost)
+            if found is not None:
+                spur_cost, spur_route = found
+                if spur_route is None:
+                    heapq.heappush(candidates, (root_cost + spur_cost, next(order), path, index, root_cost))
+                    continue
+                route = root[:-1] + spur_route
+                key = tuple(route)
+                if key not in seen:
+                    seen.add(key)
+                    heapq.heappush(candidates, (root_cost + spur_cost, next(order), route, index, None))
+            continue
+
+        yield cost, path
+
+        for i in range(len(path) - 1):
+            branches.setdefault(tuple(path[:i + 1]), set()).add(path[i + 1])
+
+        # Spurs before the point where this route left its parent were
+        # already tried from the parent (Lawler's refinement).
+        root_cost = 0
+        for i in range(len(path) - 1):
+            if i >= index:
+                bound = spur_bound(graph, weight_of, to_target, path[i], set(path[:i]),
+                                   branches[tuple(path[:i + 1])])
+                if root_cost + bound <= limit:
+                    heapq.heappush(candidates, (root_cost + bound, next(order), path, i, root_cost))
+            root_cost += weight_of(path[i], path[i + 1])
@@ -0,0 +1,83 @@
+import argparse
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from flight_core import Passenger, TicketBookingSystem
+from journal import BookingJournal
+
+# (label, sync_every); None runs without a journal as the in-memory baseline.
+POLICIES = [
+    ("memory", None),
+    ("no fsync", 0),
+    ("fsync every 1", 1),
+    ("fsync every 8", 8),
+    ("fsync every 64", 64),
+    ("fsync every 512", 512),
+]
+
+
+def run(sync_every, bookings, sync_interval, snapshot_every, directory):
+    path = os.path.join(directory, f"bench-{sync_every}.journal")
+    journal = None
+    if sync_every is not None:
+        journal = BookingJournal(path, sync_every=sync_every, sync_interval=sync_interval,
+                                 snapshot_every=snapshot_every)
+    system = TicketBookingSystem(total_tickets=bookings, journal=journal)
+
+    started = time.perf_counter()
+    for i in range(bookings):
+        system.book_tickets(1, [Passenger(f"passenger {i}", 30, f"0300{i:07d}", "KHI", "LHE")])
+    system.close()
+    elapsed = time.perf_counter() - started
+
+    result = {"bookings": bookings, "seconds": elapsed, "bookings_per_second": bookings / elapsed}
+    if journal is not None:
+        result["fsyncs"] = journal.syncs
+        started = time.perf_counter()
+        recovered = TicketBookingSystem(total_tickets=0, journal=BookingJournal(path))
+        result["replay_seconds"] = time.perf_counter() - started
+        recovered.close()
+        if recovered.tickets_issued != bookings:
+            raise RuntimeError(f"replay recovered {recovered.tickets_issued} of {bookings} bookings")
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure booking throughput under journal fsync policies.")
+    parser.add_argument("--bookings", type=int, default=5000)
+    parser.add_argument("--sync-interval", type=float, default=0.05,
+                        help="longest gap between fsyncs, in seconds")
+    parser.add_argument("--snapshot-every", type=int, default=10000)
+    parser.add_argument("--directory", help="put the journals here instead of a temporary directory")
+    parser.add_argument("--output", help="write the results as JSON to this file")
+    args = parser.parse_args(argv)
+
+    directory = args.directory or tempfile.mkdtemp(prefix="aeropathfinder-journal-")
+    try:
+        results = []
+        for label, sync_every in POLICIES:
+            result = run(sync_every, args.bookings, args.sync_interval, args.snapshot_every, directory)
+            result["policy"] = label
+            results.append(result)
+            replay = f"replay {result['replay_seconds'] * 1000:8.1f} ms" if "replay_seconds" in result else ""
+            print(f"{label:<16} {result['bookings_per_second']:10.0f} bookings/s   "
+                  f"fsyncs {result.get('fsyncs', 0):6d}   {replay}")
+    finally:
+        if not args.directory:
+            shutil.rmtree(directory, ignore_errors=True)
+
+    if args.output:
+        with open(args.output, "w") as handle:
+            json.dump({"python": sys.version.split()[0], "results": results}, handle, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
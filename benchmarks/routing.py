@@ -0,0 +1,248 @@
+import argparse
+import json
+import math
+import os
+import platform
+import random
+import sys
+import time
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from airport_data import build_network
+from dynamic_routes import ShortestPathTree
+from flight_core import FareTable, Graph, Passenger, RouteQuery, TicketBookingSystem, dijkstra
+from route_search import haversine, reconstruct_path
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+GEOMETRIES = ("geo", "random")
+# Roughly Pakistan, where the bundled network lives.
+LATITUDES = (24.0, 37.0)
+LONGITUDES = (61.0, 77.0)
+AIRPORTS_PER_CELL = 8
+
+
+def airport_code(i):
+    # AAA, AAB, ... and longer codes once three letters run out.
+    letters = []
+    while True:
+        i, digit = divmod(i, 26)
+        letters.append(chr(ord("A") + digit))
+        if i == 0 and len(letters) >= 3:
+            break
+    return "".join(reversed(letters))
+
+
+def leg_metrics(distance):
+    # Minutes and fare for a leg, loosely tied to its length.
+    return round(distance / 13.3 + 25), round(2000 + distance * 4)
+
+
+def geo_routes(count, degree, rng):
+    # Airports scattered over the map, each flying to a few others in its
+    # own or a neighbouring grid cell, plus a chain through the cells in
+    # snake order so the whole network is connected. The chain already gives
+    # each airport about two routes; sampled ones make up the rest of degree.
+    positions = [(rng.uniform(*LATITUDES), rng.uniform(*LONGITUDES)) for _ in range(count)]
+    area = (LATITUDES[1] - LATITUDES[0]) * (LONGITUDES[1] - LONGITUDES[0])
+    size = math.sqrt(area * AIRPORTS_PER_CELL / count)
+    cells = {}
+    for i, (latitude, longitude) in enumerate(positions):
+        cells.setdefault((int((latitude - LATITUDES[0]) / size), int((longitude - LONGITUDES[0]) / size)), []).append(i)
+
+    snake = sorted(cells, key=lambda cell: (cell[0], cell[1] if cell[0] % 2 == 0 else -cell[1]))
+    chain = [i for cell in snake for i in cells[cell]]
+    pairs = list(zip(chain, chain[1:]))
+    linked = {frozenset(pair) for pair in pairs}
+
+    sampled = max(degree - 2, 0) / 2
+    for (row, column), members in cells.items():
+        nearby = [j for dr in (-1, 0, 1) for dc in (-1, 0, 1) for j in cells.get((row + dr, column + dc), ())]
+        for i in members:
+            others = [j for j in nearby if j != i and frozenset((i, j)) not in linked]
+            # Each route counts towards both ends' degree, so an airport samples
+            # half its share, rounded at random to keep the average exact.
+            wanted = int(sampled) + (rng.random() < sampled % 1)
+            for j in rng.sample(others, min(wanted, len(others))):
+                pairs.append((i, j))
+                linked.add(frozenset((i, j)))
+
+    routes = []
+    for i, j in pairs:
+        distance = max(1, round(haversine(positions[i], positions[j]) * rng.uniform(1.02, 1.25)))
+        routes.append((i, j, distance))
+    return positions, routes
+
+
+def random_routes(count, degree, rng):
+    # No geography: a random spanning tree plus random extra routes.
+    routes = [(i, rng.randrange(i), rng.randint(50, 1500)) for i in range(1, count)]
+    for _ in range(count * max(degree - 2, 0) // 2):
+        i, j = rng.sample(range(count), 2)
+        routes.append((i, j, rng.randint(50, 1500)))
+    return [(None, None)] * count, routes
+
+
+def synthetic_network(count, degree=4, geometry="geo", seed=0):
+    if geometry not in GEOMETRIES:
+        raise ValueError(f"Unknown geometry: {geometry}")
+    rng = random.Random(seed)
+    positions, routes = (geo_routes if geometry == "geo" else random_routes)(count, degree, rng)
+    codes = [airport_code(i) for i in range(count)]
+    airports = [(code, f"Airport {code}", latitude, longitude)
+                for code, (latitude, longitude) in zip(codes, positions)]
+    return build_network(Graph(), airports, [
+        (codes[i], codes[j], distance, *leg_metrics(distance)) for i, j, distance in routes if i != j
+    ])
+
+
+def peak_rss_mb():
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes.
+    return peak / (1024 * 1024 if sys.platform == "darwin" else 1024)
+
+
+class Phase:
+    # Times one benchmark step. With --trace-memory it also records the peak
+    # Python allocations during the step. The RSS figure is the process peak
+    # so far, not the step's own: the OS only reports a high-water mark.
+    def __init__(self, results, name, trace_memory):
+        self.results = results
+        self.name = name
+        self.trace_memory = trace_memory
+        self.values = {}
+
+    def __enter__(self):
+        if self.trace_memory:
+            tracemalloc.start()
+        self.started = time.perf_counter()
+        return self.values
+
+    def __exit__(self, *exc_info):
+        self.values["seconds"] = time.perf_counter() - self.started
+        if self.trace_memory:
+            self.values["traced_peak_mb"] = tracemalloc.get_traced_memory()[1] / (1024 * 1024)
+            tracemalloc.stop()
+        self.values["process_rss_peak_mb"] = peak_rss_mb()
+        self.results[self.name] = self.values
+        return False
+
+
+def run(count, args):
+    rng = random.Random(args.seed + count)
+    results = {"airports": count, "degree": args.degree, "geometry": args.geometry}
+
+    with Phase(results, "build", args.trace_memory) as values:
+        graph = synthetic_network(count, args.degree, args.geometry, args.seed)
+    values["routes"] = sum(len(connections) for connections in graph.vertices.values()) // 2
+    results["routes"] = values["routes"]
+
+    names = list(graph.vertices)
+    codes = [graph.airports.code(name) for name in names]
+    sources = rng.sample(names, min(args.sources, count))
+
+    with Phase(results, "dijkstra", args.trace_memory) as values:
+        for source in sources:
+            dijkstra(graph, source)
+    values["searches"] = len(sources)
+    values["ms_per_search"] = values["seconds"] * 1000 / len(sources)
+
+    trees = [ShortestPathTree(graph, source) for source in sources]
+    per_source = max(1, args.queries // len(sources))
+    targets = [(tree.source, tree.parents, [name for name in rng.sample(names, min(per_source, count))
+                                            if name in tree.distances and name != tree.source])
+               for tree in trees]
+    hops = 0
+    with Phase(results, "path_reconstruction", args.trace_memory) as values:
+        for source, previous, destinations in targets:
+            for destination in destinations:
+                hops += len(reconstruct_path(previous, source, destination)) - 1
+    paths = sum(len(destinations) for _, _, destinations in targets)
+    values["paths"] = paths
+    values["average_hops"] = hops / paths if paths else 0
+    values["us_per_path"] = values["seconds"] * 1e6 / paths if paths else None
+    del trees, targets
+
+    pairs = [tuple(rng.sample(codes, 2)) for _ in range(args.queries)]
+    with Phase(results, "route_query", args.trace_memory) as values:
+        query = RouteQuery(graph)
+        for source, destination in pairs:
+            query.lookup(source, destination)
+    values["queries"] = len(pairs)
+    values["ms_per_query"] = values["seconds"] * 1000 / len(pairs)
+
+    fares = FareTable(graph)
+    with Phase(results, "fares", args.trace_memory) as values:
+        for source, destination in pairs:
+            fares.fare(source, destination)
+    values["quotes"] = len(pairs)
+    values["ms_per_quote"] = values["seconds"] * 1000 / len(pairs)
+    started = time.perf_counter()
+    for source, destination in pairs:
+        fares.fare(source, destination)
+    values["memoized_us_per_quote"] = (time.perf_counter() - started) * 1e6 / len(pairs)
+
+    # Bookings cycle over a fixed set of routes, as real demand does. Their
+    # fares are quoted up front, so this phase times the booking itself;
+    # the searches behind the quotes are what the fares phase measures.
+    routes = pairs[:args.booking_routes]
+    system = TicketBookingSystem(total_tickets=args.bookings, fare_table=fares)
+    with Phase(results, "bookings", args.trace_memory) as values:
+        for i in range(args.bookings):
+            source, destination = routes[i % len(routes)]
+            system.book_tickets(1, [Passenger(f"passenger {i}", 30, f"0300{i:07d}", source, destination)])
+    values["bookings"] = args.bookings
+    values["bookings_per_second"] = args.bookings / values["seconds"]
+    system.close()
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Time route searches, fares and bookings on synthetic airport networks.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000],
+                        help="airport counts to generate, e.g. 1000 100000 1000000")
+    parser.add_argument("--degree", type=int, default=4, help="average routes per airport")
+    parser.add_argument("--geometry", choices=GEOMETRIES, default="geo",
+                        help="geo places airports on a map and links neighbours; random ignores distance")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--sources", type=int, default=10, help="full Dijkstra searches per network")
+    parser.add_argument("--queries", type=int, default=200, help="point-to-point queries and fare quotes")
+    parser.add_argument("--bookings", type=int, default=5000)
+    parser.add_argument("--booking-routes", type=int, default=50, help="distinct routes the bookings cycle over")
+    parser.add_argument("--trace-memory", action="store_true",
+                        help="also record each phase's peak Python allocations (slows the timings)")
+    parser.add_argument("--output", help="write the results as JSON to this file")
+    args = parser.parse_args(argv)
+
+    results = []
+    for count in args.sizes:
+        result = run(count, args)
+        results.append(result)
+        print(f"{count:>9} airports {result['routes']:>9} routes   "
+              f"build {result['build']['seconds']:7.2f} s   "
+              f"dijkstra {result['dijkstra']['ms_per_search']:9.1f} ms   "
+              f"path {result['path_reconstruction']['us_per_path'] or 0:7.1f} us   "
+              f"query {result['route_query']['ms_per_query']:8.1f} ms   "
+              f"fare {result['fares']['ms_per_quote']:8.1f} ms   "
+              f"{result['bookings']['bookings_per_second']:8.0f} bookings/s   "
+              f"process peak RSS {result['bookings']['process_rss_peak_mb'] or 0:7.0f} MB")
+
+    if args.output:
+        with open(args.output, "w") as handle:
+            json.dump({"python": sys.version.split()[0], "platform": platform.platform(),
+                       "config": {key: value for key, value in vars(args).items() if key != "output"},
+                       "results": results}, handle, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,83 @@
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HEAVY_MODULES = ("matplotlib", "networkx", "numpy", "scipy")
+
+# Runs in a fresh interpreter so every sample pays the real cold-start cost.
+PROBE = """
+import json, sys, time
+started = time.perf_counter()
+import {module}
+imported = time.perf_counter()
+from flight_core import Graph, RouteQuery, build_flight_map
+graph = Graph()
+build_flight_map(graph)
+built = time.perf_counter()
+RouteQuery(graph).lookup("KHI", "PEW")
+queried = time.perf_counter()
+print(json.dumps({{
+    "import_ms": (imported - started) * 1000,
+    "build_ms": (built - imported) * 1000,
+    "first_query_ms": (queried - built) * 1000,
+    "heavy_modules": [name for name in {heavy!r} if name in sys.modules],
+}}))
+"""
+
+
+def sample(module):
+    code = PROBE.format(module=module, heavy=HEAVY_MODULES)
+    started = time.perf_counter()
+    output = subprocess.run([sys.executable, "-c", code], cwd=ROOT, check=True,
+                            capture_output=True, text=True).stdout
+    result = json.loads(output)
+    result["process_ms"] = (time.perf_counter() - started) * 1000
+    return result
+
+
+def measure(module, runs):
+    samples = [sample(module) for _ in range(runs)]
+    summary = {"module": module, "runs": runs,
+               "heavy_modules": sorted({name for s in samples for name in s["heavy_modules"]})}
+    for key in ("import_ms", "build_ms", "first_query_ms", "process_ms"):
+        values = [s[key] for s in samples]
+        summary[key] = {"median": statistics.median(values), "max": max(values)}
+    # Time to first query: interpreter start, import, map build and one route.
+    summary["time_to_first_query_ms"] = summary["process_ms"]["median"]
+    return summary
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure cold-start time to the first route query.")
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--modules", nargs="+", default=["flight_core", "route_service", "AeroPathfinder"])
+    parser.add_argument("--output", help="write the results as JSON to this file")
+    parser.add_argument("--max-ms", type=float, help="fail if any median time to first query exceeds this")
+    args = parser.parse_args(argv)
+
+    results = [measure(module, args.runs) for module in args.modules]
+    for result in results:
+        print(f"{result['module']:<16} import {result['import_ms']['median']:8.1f} ms   "
+              f"first query {result['time_to_first_query_ms']:8.1f} ms   "
+              f"heavy modules loaded: {', '.join(result['heavy_modules']) or 'none'}")
+
+    if args.output:
+        with open(args.output, "w") as handle:
+            json.dump({"python": sys.version.split()[0], "results": results}, handle, indent=2)
+
+    failed = [r["module"] for r in results if r["heavy_modules"]]
+    if args.max_ms is not None:
+        failed += [r["module"] for r in results if r["time_to_first_query_ms"] > args.max_ms]
+    if failed:
+        print(f"Startup regression in: {', '.join(sorted(set(failed)))}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
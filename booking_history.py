@@ -0,0 +1,159 @@
+from bisect import bisect_left, insort
+
+DEFAULT_PAGE_SIZE = 50
+
+
+class LiveCounts:
+    # A Fenwick tree over the live flags of the rows, so counting the live
+    # rows before a position and finding the k-th live row are both O(log n)
+    # however many rows have been cancelled.
+    def __init__(self):
+        self.tree = [0]
+
+    def append(self, value):
+        # The new node covers the rows since the previous power-of-two
+        # boundary; its sum is put together from the nodes below it.
+        index = len(self.tree)
+        total = value
+        child = index - 1
+        while child > index - (index & -index):
+            total += self.tree[child]
+            child -= child & -child
+        self.tree.append(total)
+
+    def add(self, position, delta):
+        index = position + 1
+        while index < len(self.tree):
+            self.tree[index] += delta
+            index += index & -index
+
+    def find(self, k):
+        # Position of the k-th live row (counting from 0), or None.
+        position = 0
+        step = 1 << (len(self.tree) - 1).bit_length()
+        while step:
+            index = position + step
+            if index < len(self.tree) and self.tree[index] <= k:
+                position = index
+                k -= self.tree[index]
+            step >>= 1
+        return position if position < len(self.tree) - 1 else None
+
+
+class BookingHistory:
+    # Issued tickets in booking order, indexed by ticket number, passenger
+    # name and route. Cancelled tickets are only marked, so positions never
+    # move and a page is a slice of the matching positions.
+    def __init__(self):
+        self.rows = []
+        self.alive = []
+        self.active = 0
+        self.live = LiveCounts()
+        self.by_ticket = {}
+        self.by_name = {}
+        self.names = []
+        self.by_source = {}
+        self.by_destination = {}
+        self.version = 0
+        self.last_search = None
+
+    def add(self, passenger):
+        position = len(self.rows)
+        self.version += 1
+        self.rows.append(passenger)
+        self.alive.append(True)
+        self.live.append(1)
+        self.active += 1
+        self.by_ticket[passenger.ticket_number] = position
+
+        name = str(passenger.name).lower()
+        if name not in self.by_name:
+            self.by_name[name] = []
+            insort(self.names, name)
+        self.by_name[name].append(position)
+        self.by_source.setdefault(str(passenger.source_airport).upper(), []).append(position)
+        self.by_destination.setdefault(str(passenger.destination_airport).upper(), []).append(position)
+        return position
+
+    def remove(self, ticket_number):
+        position = self.by_ticket.pop(ticket_number, None)
+        if position is None:
+            return False
+        self.version += 1
+        self.alive[position] = False
+        self.live.add(position, -1)
+        self.active -= 1
+        return True
+
+    def __len__(self):
+        return self.active
+
+    def name_positions(self, prefix):
+        # Names are kept sorted, so every name starting with the prefix is one contiguous run.
+        prefix = prefix.lower()
+        runs = []
+        index = bisect_left(self.names, prefix)
+        while index < len(self.names) and self.names[index].startswith(prefix):
+            runs.append(self.by_name[self.names[index]])
+            index += 1
+        if len(runs) == 1:
+            return runs[0]
+        return sorted(position for run in runs for position in run)
+
+    def positions(self, name=None, source=None, destination=None, ticket=None):
+        # Starts from the most selective index and checks the other filters per row.
+        candidates = []
+        if ticket:
+            ticket_position = self.by_ticket.get(ticket)
+            if ticket_position is None and str(ticket).isdigit():
+                ticket_position = self.by_ticket.get(f"Ticket {ticket}")
+            candidates.append([] if ticket_position is None else [ticket_position])
+        if name:
+            candidates.append(self.name_positions(name))
+        if source:
+            candidates.append(self.by_source.get(source.upper(), []))
+        if destination:
+            candidates.append(self.by_destination.get(destination.upper(), []))
+        if not candidates:
+            return None
+
+        smallest = min(candidates, key=len)
+        name = name.lower() if name else None
+        source = source.upper() if source else None
+        destination = destination.upper() if destination else None
+        matches = []
+        for position in smallest:
+            passenger = self.rows[position]
+            if not self.alive[position]:
+                continue
+            if name and not str(passenger.name).lower().startswith(name):
+                continue
+            if source and str(passenger.source_airport).upper() != source:
+                continue
+            if destination and str(passenger.destination_airport).upper() != destination:
+                continue
+            if ticket and position != ticket_position:
+                continue
+            matches.append(position)
+        return matches
+
+    def page(self, page=0, page_size=DEFAULT_PAGE_SIZE, **filters):
+        # Returns the passengers on one page and the total number of matches.
+        start = page * page_size
+        filters = {key: value for key, value in filters.items() if value}
+        if filters:
+            # Paging through one search reuses its matches until the history changes.
+            key = (tuple(sorted(filters.items())), self.version)
+            if self.last_search is None or self.last_search[0] != key:
+                self.last_search = (key, self.positions(**filters))
+            matches = self.last_search[1]
+            return [self.rows[position] for position in matches[start:start + page_size]], len(matches)
+
+        if self.active == len(self.rows):
+            return self.rows[start:start + page_size], self.active
+
+        # With cancellations, each live row on the page is found through the tree.
+        passengers = []
+        for k in range(start, min(start + page_size, self.active)):
+            passengers.append(self.rows[self.live.find(k)])
+        return passengers, self.active
@@ -0,0 +1,263 @@
+from array import array
+import heapq
+
+INF = float('inf')
+
+
+class CompactGraph:
+    # Frozen CSR snapshot of a Graph: the neighbours of vertex i are
+    # neighbors[offsets[i]:offsets[i + 1]] with matching weights.
+    __slots__ = ("names", "ids", "offsets", "neighbors", "weights", "version")
+
+    def __init__(self, names, offsets, neighbors, weights, version=0):
+        self.names = tuple(names)
+        self.ids = {name: i for i, name in enumerate(self.names)}
+        self.offsets = memoryview(offsets).toreadonly()
+        self.neighbors = memoryview(neighbors).toreadonly()
+        self.weights = memoryview(weights).toreadonly()
+        self.version = version
+
+    @classmethod
+    def from_graph(cls, graph):
+        names = list(graph.vertices)
+        ids = {name: i for i, name in enumerate(names)}
+        offsets = array('q', [0])
+        neighbors = array('i')
+        weights = array('d')
+
+        for name in names:
+            for neighbor, weight in graph.vertices[name].items():
+                neighbors.append(ids[neighbor])
+                weights.append(weight)
+            offsets.append(len(neighbors))
+
+        return cls(names, offsets, neighbors, weights, getattr(graph, "version", 0))
+
+    def __setattr__(self, name, value):
+        if hasattr(self, name):
+            raise AttributeError("CompactGraph is frozen")
+        object.__setattr__(self, name, value)
+
+    @property
+    def vertex_count(self):
+        return len(self.names)
+
+    @property
+    def edge_count(self):
+        return len(self.neighbors)
+
+    def id_of(self, name):
+        return self.ids[name]
+
+    def name_of(self, vertex_id):
+        return self.names[vertex_id]
+
+    def edges_from(self, vertex_id):
+        for e in range(self.offsets[vertex_id], self.offsets[vertex_id + 1]):
+            yield self.neighbors[e], self.weights[e]
+
+    def memory_usage(self):
+        return self.offsets.nbytes + self.neighbors.nbytes + self.weights.nbytes
+
+    def dijkstra(self, source_id, target_id=-1):
+        offsets = self.offsets
+        neighbors = self.neighbors
+        weights = self.weights
+        heappush = heapq.heappush
+        heappop = heapq.heappop
+
+        distances = array('d', [INF]) * len(self.names)
+        previous = array('i', [-1]) * len(self.names)
+        distances[source_id] = 0.0
+        priority_queue = [(0.0, source_id)]
+
+        while priority_queue:
+            current_distance, current_id = heappop(priority_queue)
+
+            if current_distance > distances[current_id]:
+                continue
+            if current_id == target_id:
+                break
+
+            for e in range(offsets[current_id], offsets[current_id + 1]):
+                neighbor_id = neighbors[e]
+                distance = current_distance + weights[e]
+
+                if distance < distances[neighbor_id]:
+                    distances[neighbor_id] = distance
+                    previous[neighbor_id] = current_id
+                    heappush(priority_queue, (distance, neighbor_id))
+
+        return distances, previous
+
+    def path_ids(self, previous, source_id, target_id):
+        path = [target_id]
+        while path[-1] != source_id:
+            if previous[path[-1]] == -1:
+                return []
+            path.append(previous[path[-1]])
+        path.reverse()
+        return path
+
+    def shortest_path(self, source, destination):
+        source_id = self.ids[source]
+        target_id = self.ids[destination]
+        distances, previous = self.dijkstra(source_id, target_id)
+        path = self.path_ids(previous, source_id, target_id)
+        return distances[target_id], [self.names[i] for i in path]
+
+
+class BatchShortestPaths:
+    def __init__(self, compact, source_ids, distances, predecessors=None, edge_metrics=None, edges=None):
+        self.compact = compact
+        self.source_ids = source_ids
+        self.row_of = {source_id: row for row, source_id in enumerate(source_ids)}
+        self.distances = distances
+        self.predecessors = predecessors
+        # (src, dest) -> (time, cost) as on Graph; legs not listed use the defaults.
+        self.edge_metrics = edge_metrics or {}
+        # The graph's EdgeStore, if its pairs are built from flights.
+        self.edges = edges
+
+    @property
+    def names(self):
+        return self.compact.names
+
+    @property
+    def ids(self):
+        return self.compact.ids
+
+    def distance(self, source, destination):
+        row = self.row_of[self.compact.ids[source]]
+        return float(self.distances[row, self.compact.ids[destination]])
+
+    def path(self, source, destination):
+        if self.predecessors is None:
+            raise ValueError("predecessors were not requested for this batch")
+        source_id = self.compact.ids[source]
+        return [self.compact.names[i] for i in self.compact.path_ids(
+            self.predecessors[self.row_of[source_id]], source_id, self.compact.ids[destination])]
+
+    def tree_sums(self, edge_values):
+        # Sums a value per CSR edge along every row's shortest-path tree.
+        # Rows are walked in order of increasing distance so each vertex's
+        # predecessor already has its total; -1 marks unreachable pairs.
+        import numpy as np
+
+        if self.predecessors is None:
+            raise ValueError("predecessors were not requested for this batch")
+
+        size = self.compact.vertex_count
+        offsets = np.frombuffer(self.compact.offsets, dtype=np.int64)
+        neighbors = np.frombuffer(self.compact.neighbors, dtype=np.int32)
+        keys = np.repeat(np.arange(size, dtype=np.int64), np.diff(offsets)) * size + neighbors
+        order = np.argsort(keys, kind="stable")
+        keys = keys[order]
+        edge_values = np.asarray(edge_values)[order]
+
+        rows = np.arange(len(self.source_ids))
+        sums = np.full(self.distances.shape, -1, dtype=edge_values.dtype)
+        sums[rows, self.source_ids] = 0
+        distance_order = np.argsort(self.distances, axis=1, kind="stable")
+
+        for k in range(self.distances.shape[1]):
+            columns = distance_order[:, k]
+            parents = self.predecessors[rows, columns]
+            reachable = parents >= 0
+            tree_rows, parents, columns = rows[reachable], parents[reachable], columns[reachable]
+            edges = np.searchsorted(keys, parents * size + columns)
+            sums[tree_rows, columns] = sums[tree_rows, parents] + edge_values[edges]
+
+        return sums
+
+    def edge_values(self, position):
+        # One of the per-edge metrics (0 time, 1 cost) in CSR edge order. Where
+        # flights serve a pair, the leg is the shortest flight, as RouteQuery
+        # charges it, not the best time and cost of different carriers.
+        from pareto import DEFAULT_EDGE_METRICS
+        import numpy as np
+
+        compact = self.compact
+        if not self.edge_metrics and not self.edges:
+            return np.full(compact.edge_count, DEFAULT_EDGE_METRICS[position], dtype=np.float64)
+        names = compact.names
+        metrics = self.edge_metrics
+        edges = self.edges
+        column = edges.column(("time", "cost")[position]) if edges else None
+        values = np.empty(compact.edge_count, dtype=np.float64)
+        for i, name in enumerate(names):
+            for e in range(compact.offsets[i], compact.offsets[i + 1]):
+                dest = names[compact.neighbors[e]]
+                edge_id = edges.best(name, dest) if edges else None
+                if edge_id is not None:
+                    values[e] = column[edge_id]
+                else:
+                    values[e] = metrics.get((name, dest), DEFAULT_EDGE_METRICS)[position]
+        return values
+
+    def hop_counts(self):
+        import numpy as np
+
+        return self.tree_sums(np.ones(self.compact.edge_count, dtype=np.int64))
+
+    def fares(self):
+        # Priced from the legs' own costs, as RouteQuery and FareTable are.
+        from fares import BASE_FARE
+        import numpy as np
+
+        costs = self.tree_sums(self.edge_values(1))
+        return np.where(costs >= 0, BASE_FARE + costs, -1)
+
+    def times(self):
+        return self.tree_sums(self.edge_values(0))
+
+
+def batch_shortest_paths(graph, sources=None, return_predecessors=False):
+    # Distances for many sources at once: SciPy's compiled dijkstra over the
+    # CSR arrays when available, otherwise one flat-array search per source.
+    try:
+        import numpy as np
+    except ImportError as error:
+        raise ImportError("batch_shortest_paths requires numpy") from error
+
+    compact = graph if isinstance(graph, CompactGraph) else graph.compact()
+    edge_metrics = getattr(graph, "edge_metrics", None)
+    edges = getattr(graph, "edges", None)
+    if sources is None:
+        source_ids = np.arange(compact.vertex_count)
+    else:
+        source_ids = np.array([compact.ids[name] for name in sources], dtype=np.int64)
+
+    try:
+        from scipy.sparse import csr_matrix
+        from scipy.sparse.csgraph import dijkstra as csgraph_dijkstra
+    except ImportError:
+        csgraph_dijkstra = None
+
+    if csgraph_dijkstra is not None:
+        size = compact.vertex_count
+        matrix = csr_matrix((np.frombuffer(compact.weights, dtype=np.float64),
+                             np.frombuffer(compact.neighbors, dtype=np.int32),
+                             np.frombuffer(compact.offsets, dtype=np.int64)), shape=(size, size))
+        result = csgraph_dijkstra(matrix, directed=True, indices=source_ids,
+                                  return_predecessors=return_predecessors)
+        if return_predecessors:
+            distances, predecessors = result
+            predecessors = predecessors.astype(np.int64)
+            predecessors[predecessors < 0] = -1
+        else:
+            distances, predecessors = result, None
+        return BatchShortestPaths(compact, source_ids, distances, predecessors, edge_metrics, edges)
+
+    distances = np.empty((len(source_ids), compact.vertex_count), dtype=np.float64)
+    predecessors = None
+    if return_predecessors:
+        predecessors = np.empty((len(source_ids), compact.vertex_count), dtype=np.int64)
+
+    for row, source_id in enumerate(source_ids):
+        row_distances, row_previous = compact.dijkstra(int(source_id))
+        distances[row] = np.frombuffer(row_distances, dtype=np.float64)
+        if return_predecessors:
+            predecessors[row] = np.frombuffer(row_previous, dtype=np.int32)
+
+    return BatchShortestPaths(compact, source_ids, distances, predecessors, edge_metrics, edges)
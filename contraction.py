@@ -0,0 +1,248 @@
+import heapq
+import json
+
+INF = float('inf')
+FORMAT_NAME = "aeropathfinder-ch"
+FORMAT_VERSION = 1
+
+
+class ContractionHierarchy:
+    # upward[v] holds the edges (original or shortcut) from v to vertices
+    # contracted after it; middle[(u, v)] names the vertex a shortcut bypasses.
+    def __init__(self, names, rank, upward, middle):
+        self.names = list(names)
+        self.ids = {name: i for i, name in enumerate(self.names)}
+        self.rank = rank
+        self.upward = upward
+        self.middle = middle
+
+    def edge_weight(self, u, v):
+        if self.rank[u] < self.rank[v]:
+            return self.upward[u][v]
+        return self.upward[v][u]
+
+    def unpack(self, u, v):
+        edges = []
+        stack = [(u, v)]
+        while stack:
+            a, b = stack.pop()
+            m = self.middle.get((a, b) if a < b else (b, a))
+            if m is None:
+                edges.append((a, b))
+            else:
+                stack.append((m, b))
+                stack.append((a, m))
+        return edges
+
+    def query_ids(self, source_id, target_id):
+        if source_id == target_id:
+            return [source_id], 0
+
+        distances = ({source_id: 0}, {target_id: 0})
+        previous = ({}, {})
+        settled = (set(), set())
+        queues = ([(0, source_id)], [(0, target_id)])
+        best = INF
+        meeting = None
+        settled_count = 0
+
+        while True:
+            for side in (0, 1):
+                if queues[side] and queues[side][0][0] >= best:
+                    queues[side].clear()
+            if not queues[0] and not queues[1]:
+                break
+
+            if not queues[1] or (queues[0] and queues[0][0][0] <= queues[1][0][0]):
+                side = 0
+            else:
+                side = 1
+            current_distance, current_id = heapq.heappop(queues[side])
+
+            if current_id in settled[side]:
+                continue
+            settled[side].add(current_id)
+            settled_count += 1
+
+            other_distance = distances[1 - side].get(current_id)
+            if other_distance is not None and current_distance + other_distance < best:
+                best = current_distance + other_distance
+                meeting = current_id
+
+            for neighbor_id, weight in self.upward[current_id].items():
+                distance = current_distance + weight
+                if distance < distances[side].get(neighbor_id, INF):
+                    distances[side][neighbor_id] = distance
+                    previous[side][neighbor_id] = current_id
+                    heapq.heappush(queues[side], (distance, neighbor_id))
+
+        if meeting is None:
+            return [], settled_count
+
+        upward_path = [meeting]
+        while upward_path[-1] != source_id:
+            upward_path.append(previous[0][upward_path[-1]])
+        upward_path.reverse()
+        vertex = meeting
+        while vertex != target_id:
+            vertex = previous[1][vertex]
+            upward_path.append(vertex)
+
+        path = [source_id]
+        for u, v in zip(upward_path, upward_path[1:]):
+            for a, b in self.unpack(u, v):
+                path.append(b)
+        return path, settled_count
+
+    def route(self, source, destination):
+        if source not in self.ids or destination not in self.ids:
+            return INF, [], 0
+
+        path_ids, settled = self.query_ids(self.ids[source], self.ids[destination])
+        if not path_ids:
+            return INF, [], settled
+
+        # Summing the original edges from the source adds them in the same
+        # order dijkstra does, so float weights round the same way too.
+        distance = 0
+        for u, v in zip(path_ids, path_ids[1:]):
+            distance += self.edge_weight(u, v)
+        return distance, [self.names[i] for i in path_ids], settled
+
+    def query(self, source, destination):
+        distance, path, _ = self.route(source, destination)
+        return distance, path
+
+    def distance(self, source, destination):
+        return self.query(source, destination)[0]
+
+    def to_dict(self):
+        return {
+            "format": FORMAT_NAME,
+            "version": FORMAT_VERSION,
+            "names": self.names,
+            "rank": self.rank,
+            "upward": [[[v, w] for v, w in edges.items()] for edges in self.upward],
+            "middle": [[u, v, m] for (u, v), m in self.middle.items()],
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        if data.get("format") != FORMAT_NAME or data.get("version") != FORMAT_VERSION:
+            raise ValueError("Not a contraction hierarchy file this version can read")
+        upward = [{v: w for v, w in edges} for edges in data["upward"]]
+        middle = {(u, v): m for u, v, m in data["middle"]}
+        return cls(data["names"], data["rank"], upward, middle)
+
+    def save(self, path):
+        with open(path, "w") as handle:
+            json.dump(self.to_dict(), handle, separators=(",", ":"))
+
+    @classmethod
+    def load(cls, path):
+        with open(path) as handle:
+            return cls.from_dict(json.load(handle))
+
+
+def _witness_distances(adjacency, source, excluded, max_distance, settle_limit):
+    distances = {source: 0}
+    priority_queue = [(0, source)]
+    settled = 0
+
+    while priority_queue and settled < settle_limit:
+        current_distance, current_id = heapq.heappop(priority_queue)
+        if current_distance > distances[current_id]:
+            continue
+        if current_distance > max_distance:
+            break
+        settled += 1
+
+        for neighbor_id, weight in adjacency[current_id].items():
+            if neighbor_id == excluded:
+                continue
+            distance = current_distance + weight
+            if distance < distances.get(neighbor_id, INF):
+                distances[neighbor_id] = distance
+                heapq.heappush(priority_queue, (distance, neighbor_id))
+
+    return distances
+
+
+def _shortcuts(adjacency, vertex, settle_limit):
+    # A shortcut u-w is needed unless a witness path avoiding the vertex is
+    # at most as long. Stopping the witness search early only ever adds
+    # extra shortcuts, never drops a needed one.
+    neighbors = list(adjacency[vertex].items())
+    shortcuts = []
+    for i, (u, weight_u) in enumerate(neighbors):
+        targets = neighbors[i + 1:]
+        if not targets:
+            continue
+        max_distance = weight_u + max(weight for _, weight in targets)
+        witnesses = _witness_distances(adjacency, u, vertex, max_distance, settle_limit)
+        for w, weight_w in targets:
+            through = weight_u + weight_w
+            if witnesses.get(w, INF) > through:
+                shortcuts.append((u, w, through))
+    return shortcuts
+
+
+def build_hierarchy(graph, settle_limit=64):
+    if getattr(graph, "directed", False):
+        raise ValueError("Contraction hierarchies need an undirected route graph")
+    names = list(graph.vertices)
+    ids = {name: i for i, name in enumerate(names)}
+    adjacency = [{} for _ in names]
+    for name, connections in graph.vertices.items():
+        for neighbor, weight in connections.items():
+            u, v = ids[name], ids[neighbor]
+            if u != v and weight < adjacency[u].get(v, INF):
+                adjacency[u][v] = weight
+                adjacency[v][u] = weight
+
+    middle = {}
+    upward = [None] * len(names)
+    rank = [0] * len(names)
+    contracted_neighbors = [0] * len(names)
+
+    def priority(vertex):
+        shortcut_count = len(_shortcuts(adjacency, vertex, settle_limit))
+        return shortcut_count - len(adjacency[vertex]) + contracted_neighbors[vertex]
+
+    queue = [(priority(v), v) for v in range(len(names))]
+    heapq.heapify(queue)
+    next_rank = 0
+
+    while queue:
+        _, vertex = heapq.heappop(queue)
+        # Lazy update: re-evaluate and put back if it is no longer the cheapest.
+        current = priority(vertex)
+        if queue and current > queue[0][0]:
+            heapq.heappush(queue, (current, vertex))
+            continue
+
+        for u, w, weight in _shortcuts(adjacency, vertex, settle_limit):
+            if weight < adjacency[u].get(w, INF):
+                adjacency[u][w] = weight
+                adjacency[w][u] = weight
+                middle[(u, w) if u < w else (w, u)] = vertex
+
+        upward[vertex] = dict(adjacency[vertex])
+        rank[vertex] = next_rank
+        next_rank += 1
+        for neighbor in adjacency[vertex]:
+            del adjacency[neighbor][vertex]
+            contracted_neighbors[neighbor] += 1
+        adjacency[vertex] = {}
+
+    return ContractionHierarchy(names, rank, upward, middle)
+
+
+def hierarchy_search(graph, source, destination):
+    # A hierarchy built before the latest graph change may be wrong, so
+    # answer with a plain search until it is rebuilt.
+    if graph.hierarchy is None or graph.hierarchy_version != graph.version:
+        result = graph.shortest_path(source, destination)
+        return result.distance, result.path, result.settled
+    return graph.hierarchy.route(source, destination)
+
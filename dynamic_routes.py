@@ -0,0 +1,200 @@
+from collections import OrderedDict
+import heapq
+import threading
+
+INF = float('inf')
+DEFAULT_MAX_SOURCES = 256
+
+
+class ShortestPathTree:
+    # Distances, parents and children from one source, kept in step with the
+    # graph by repairing only the part of the tree an edge change can reach.
+    def __init__(self, graph, source):
+        self.graph = graph
+        self.source = source
+        self.distances = {source: 0}
+        self.parents = {source: None}
+        self.children = {}
+        self.answers = {}
+        self.search([(0, source)], None)
+
+    def distance(self, vertex):
+        return self.distances.get(vertex, INF)
+
+    def path(self, destination):
+        if destination not in self.distances:
+            return []
+        path = []
+        vertex = destination
+        while vertex is not None:
+            path.append(vertex)
+            vertex = self.parents[vertex]
+        path.reverse()
+        return path
+
+    def set_parent(self, vertex, parent):
+        old_parent = self.parents.get(vertex)
+        if old_parent is not None:
+            self.children[old_parent].discard(vertex)
+        self.parents[vertex] = parent
+        if parent is not None:
+            self.children.setdefault(parent, set()).add(vertex)
+
+    def search(self, priority_queue, within, touched=None):
+        # Dijkstra from the queued vertices. Settled vertices are those whose
+        # queued distance is still current; within limits which vertices may
+        # be relaxed (None for the whole graph).
+        vertices = self.graph.vertices
+        distances = self.distances
+        while priority_queue:
+            current_distance, current_vertex = heapq.heappop(priority_queue)
+
+            if current_distance > distances.get(current_vertex, INF):
+                continue
+
+            for neighbor, weight in vertices[current_vertex].items():
+                if within is not None and neighbor not in within:
+                    continue
+                distance = current_distance + weight
+
+                if distance < distances.get(neighbor, INF):
+                    distances[neighbor] = distance
+                    self.set_parent(neighbor, current_vertex)
+                    if touched is not None:
+                        touched.add(neighbor)
+                    heapq.heappush(priority_queue, (distance, neighbor))
+
+    def subtree(self, root):
+        vertices = [root]
+        for vertex in vertices:
+            vertices.extend(self.children.get(vertex, ()))
+        return vertices
+
+    def edge_dearer(self, src, dest, touched):
+        # Only the subtree hanging off a tree edge can get longer. It is cut
+        # loose, each vertex restarts from its best neighbour outside it, and
+        # a search confined to the subtree settles the rest.
+        if self.parents.get(dest) != src:
+            return
+        affected = self.subtree(dest)
+        affected_set = set(affected)
+        for vertex in affected:
+            self.set_parent(vertex, None)
+            del self.distances[vertex]
+        touched.update(affected)
+
+        vertices = self.graph.vertices
+        reverse = self.graph.reverse_vertices()
+        priority_queue = []
+        for vertex in affected:
+            best, best_parent = INF, None
+            for neighbor in reverse.get(vertex, ()):
+                if neighbor in affected_set or neighbor not in self.distances:
+                    continue
+                distance = self.distances[neighbor] + vertices[neighbor][vertex]
+                if distance < best:
+                    best, best_parent = distance, neighbor
+            if best_parent is not None:
+                self.distances[vertex] = best
+                self.set_parent(vertex, best_parent)
+                priority_queue.append((best, vertex))
+
+        heapq.heapify(priority_queue)
+        self.search(priority_queue, affected_set)
+        for vertex in affected:
+            if vertex not in self.distances:
+                del self.parents[vertex]
+
+    def edge_cheaper(self, src, dest, weight, touched):
+        # A new or cheaper edge only helps if it shortcuts dest; the gain then
+        # spreads outwards from dest and stops wherever it runs out.
+        distance = self.distance(src) + weight
+        if distance < self.distance(dest):
+            self.distances[dest] = distance
+            self.set_parent(dest, src)
+            touched.add(dest)
+            self.search([(distance, dest)], None, touched)
+
+
+class DynamicRoutes:
+    # Shortest-path trees for the sources that have been asked about, kept
+    # current through edge updates instead of being searched again. Every
+    # answer handed out is remembered, so an update can report exactly which
+    # (source, destination) answers it changed.
+    def __init__(self, graph, max_sources=DEFAULT_MAX_SOURCES):
+        self.graph = graph
+        self.max_sources = max_sources
+        self.trees = OrderedDict()
+        self.version = graph.version
+        self.lock = threading.Lock()
+
+    def tree(self, source):
+        if self.version != self.graph.version:
+            # The graph was changed behind our back, e.g. by a bulk load.
+            self.trees.clear()
+            self.version = self.graph.version
+        tree = self.trees.get(source)
+        if tree is None:
+            tree = self.trees[source] = ShortestPathTree(self.graph, source)
+            while len(self.trees) > self.max_sources:
+                self.trees.popitem(last=False)
+        self.trees.move_to_end(source)
+        return tree
+
+    def lookup(self, source, destination):
+        with self.lock:
+            tree = self.tree(source)
+            answer = tree.distance(destination), tree.path(destination)
+            tree.answers[destination] = answer
+            return answer
+
+    def add_vertex(self, name, existed):
+        # A brand-new airport has no connections and changes no tree.
+        with self.lock:
+            if existed:
+                self.trees.clear()
+            self.version = self.graph.version
+
+    def edge_changed(self, src, dest, old_weight, new_weight):
+        # Called after the graph holds the new weight (None once removed).
+        # Returns the remembered answers that changed.
+        with self.lock:
+            if self.version + 1 != self.graph.version:
+                self.trees.clear()
+            self.version = self.graph.version
+            if old_weight == new_weight:
+                return []
+
+            directions = ((src, dest),) if self.graph.directed else ((src, dest), (dest, src))
+            changed = []
+            for tree in self.trees.values():
+                touched = set()
+                for edge_src, edge_dest in directions:
+                    if old_weight is not None and (new_weight is None or new_weight > old_weight):
+                        tree.edge_dearer(edge_src, edge_dest, touched)
+                    else:
+                        tree.edge_cheaper(edge_src, edge_dest, new_weight, touched)
+                if touched:
+                    changed.extend(self.changed_answers(tree, touched))
+            return changed
+
+    def changed_answers(self, tree, touched):
+        # An answer can only change if its destination or some vertex on its
+        # old path was touched; anything else still has the same parents.
+        changed = []
+        for destination, (distance, path) in tree.answers.items():
+            if destination not in touched and not any(vertex in touched for vertex in path):
+                continue
+            answer = tree.distance(destination), tree.path(destination)
+            if answer != (distance, path):
+                tree.answers[destination] = answer
+                changed.append((tree.source, destination))
+        return changed
+
+    def forget(self, source):
+        with self.lock:
+            self.trees.pop(source, None)
+
+    def clear(self):
+        with self.lock:
+            self.trees.clear()
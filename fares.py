@@ -0,0 +1,11 @@
+BASE_FARE = 20
+FARE_PER_LEG = 1500
+MINUTES_PER_LEG = 5
+
+
+def fare_for_legs(legs):
+    return BASE_FARE + legs * FARE_PER_LEG
+
+
+def time_for_legs(legs):
+    return legs * MINUTES_PER_LEG
@@ -0,0 +1,838 @@
+import heapq
+from route_table import RouteTable, ROUTE_TABLE_MAX_VERTICES
+from route_cache import RouteCache
+from compact_graph import CompactGraph
+from fares import BASE_FARE, fare_for_legs, time_for_legs
+from route_search import astar, bidirectional_dijkstra, reconstruct_path
+from contraction import build_hierarchy, hierarchy_search
+from pareto import METRICS, DEFAULT_EDGE_METRICS, metric_shortest_path, pareto_routes
+from waitlist import Waitlist, TIER_STANDARD
+from booking_history import BookingHistory
+from airport_data import load_network, default_airport_index
+from time_profiles import EdgeProfiles, time_dependent_path
+from dynamic_routes import DynamicRoutes, DEFAULT_MAX_SOURCES
+from flight_edges import EdgeStore
+from alternative_routes import k_shortest_paths
+from inventory import SeatsUnavailable
+
+class Passenger:
+    # date and route (the airports flown through) are set for passengers
+    # booked onto dated flights; they hold a seat on every leg of the route.
+    __slots__ = ("name", "age", "phone", "source_airport", "destination_airport", "ticket_number", "fare",
+                 "date", "route")
+
+    def __init__(self, name, age, phone, source_airport, destination_airport, ticket_number=None, fare=None,
+                 date=None, route=None):
+        self.name = name
+        self.age = age
+        self.phone = phone
+        self.source_airport = source_airport
+        self.destination_airport = destination_airport
+        self.ticket_number = ticket_number
+        self.fare = fare
+        self.date = date
+        self.route = route
+
+class ListNode:
+    __slots__ = ("passenger", "next")
+
+    def __init__(self, passenger):
+        self.passenger = passenger
+        self.next = None
+
+class LinkedList:
+    def __init__(self):
+        self.head = None
+        self.tail = None
+        self.size = 0
+
+    def add_passenger(self, passenger):
+        new_node = ListNode(passenger)
+        if not self.head:
+            self.head = new_node
+        else:
+            self.tail.next = new_node
+        self.tail = new_node
+        self.size += 1
+        return new_node
+
+    def find_passenger(self, passenger_name):
+        current = self.head
+        while current:
+            if current.passenger.name == passenger_name:
+                return current.passenger
+            current = current.next
+        return None
+
+    def __iter__(self):
+        current = self.head
+        while current:
+            yield current.passenger
+            current = current.next
+
+    def __len__(self):
+        return self.size
+
+class PassengerStore(LinkedList):
+    # Linked list in booking order plus hash indexes, so inserts and lookups
+    # by name, phone or ticket number are O(1).
+    def __init__(self):
+        super().__init__()
+        self.by_name = {}
+        self.by_phone = {}
+        self.by_ticket = {}
+
+    def add_passenger(self, passenger):
+        node = super().add_passenger(passenger)
+        # Like the scan it replaces, a name lookup returns the first booking.
+        self.by_name.setdefault(passenger.name, passenger)
+        self.by_phone.setdefault(passenger.phone, []).append(passenger)
+        if passenger.ticket_number is not None:
+            self.by_ticket[passenger.ticket_number] = passenger
+        return node
+
+    def find_passenger(self, passenger_name):
+        return self.by_name.get(passenger_name)
+
+    def find_by_phone(self, phone):
+        return list(self.by_phone.get(phone, []))
+
+    def find_by_ticket(self, ticket_number):
+        return self.by_ticket.get(ticket_number)
+
+class Graph:
+    # Undirected by default: add_edge flies both ways. A directed graph keeps
+    # each direction on its own and a reverse adjacency for backward searches.
+    def __init__(self, directed=False):
+        self.directed = directed
+        self.vertices = {}
+        self.reverse = {}
+        self.coordinates = {}
+        self.edge_metrics = {}
+        self.version = 0
+        self.route_table = None
+        self.route_table_limit = ROUTE_TABLE_MAX_VERTICES
+        self.route_cache = None
+        self.compact_graph = None
+        self.hierarchy = None
+        self.hierarchy_version = None
+        self.airports = None
+        self.time_profiles = None
+        self.dynamic_routes = None
+        self.edges = None
+
+    def add_vertex(self, name, latitude=None, longitude=None):
+        # Adding an existing airport again clears its routes (on a directed graph, those leaving it).
+        existed = name in self.vertices
+        if self.directed:
+            for dest in self.vertices.get(name, ()):
+                self.reverse[dest].pop(name, None)
+            self.reverse.setdefault(name, {})
+        else:
+            for dest in self.vertices.get(name, ()):
+                self.vertices[dest].pop(name, None)
+                self.edge_metrics.pop((dest, name), None)
+        for dest in self.vertices.get(name, ()):
+            self.edge_metrics.pop((name, dest), None)
+        self.vertices[name] = {}
+        if latitude is not None and longitude is not None:
+            self.coordinates[name] = (latitude, longitude)
+        self.version += 1
+        if self.route_table:
+            if len(self.vertices) > self.route_table_limit:
+                self.route_table = None
+            else:
+                self.route_table.add_vertex(name)
+        if self.dynamic_routes:
+            self.dynamic_routes.add_vertex(name, existed)
+
+    def add_edge(self, src, dest, weight, time=None, cost=None):
+        old_weight = self.vertices[src].get(dest)
+        self._store_edge(src, dest, weight, time, cost)
+        return self._edge_changed(src, dest, old_weight, weight)
+
+    def update_edge(self, src, dest, weight, time=None, cost=None):
+        # Re-weights an existing route and returns the (source, destination)
+        # answers handed out by the dynamic routes that changed as a result.
+        if dest not in self.vertices.get(src, {}):
+            raise ValueError(f"No route from {src} to {dest}")
+        return self.add_edge(src, dest, weight, time, cost)
+
+    def remove_edge(self, src, dest):
+        if dest not in self.vertices.get(src, {}):
+            raise ValueError(f"No route from {src} to {dest}")
+        old_weight = self.vertices[src].pop(dest)
+        if self.directed:
+            self.reverse[dest].pop(src, None)
+        else:
+            self.vertices[dest].pop(src, None)
+        for edge in self._directions(src, dest):
+            self.edge_metrics.pop(edge, None)
+            if self.time_profiles:
+                self.time_profiles.profiles.pop(edge, None)
+                self.time_profiles.closures.pop(edge, None)
+        return self._edge_changed(src, dest, old_weight, None)
+
+    def _directions(self, src, dest):
+        return ((src, dest),) if self.directed else ((src, dest), (dest, src))
+
+    def _edge_changed(self, src, dest, old_weight, new_weight):
+        self.version += 1
+        if self.route_table:
+            self.route_table.edge_changed(src, dest, old_weight, float('inf') if new_weight is None else new_weight)
+        if self.dynamic_routes:
+            return self.dynamic_routes.edge_changed(src, dest, old_weight, new_weight)
+        return []
+
+    def _store_edge(self, src, dest, weight, time, cost):
+        self.vertices[src][dest] = weight
+        if self.directed:
+            self.reverse[dest][src] = weight
+        else:
+            self.vertices[dest][src] = weight
+        # weight is the distance in KM; legs without their own time or cost
+        # keep the flat per-leg minutes and fare.
+        if time is None and cost is None:
+            for edge in self._directions(src, dest):
+                self.edge_metrics.pop(edge, None)
+        else:
+            metrics = (DEFAULT_EDGE_METRICS[0] if time is None else time,
+                       DEFAULT_EDGE_METRICS[1] if cost is None else cost)
+            for edge in self._directions(src, dest):
+                self.edge_metrics[edge] = metrics
+
+    def add_flight(self, src, dest, distance, carrier=None, time=None, cost=None):
+        # One carrier's flight, kept under its own id in self.edges. The
+        # adjacency holds only the shortest flight per direction and
+        # edge_metrics the fastest and cheapest, so searches relax one entry
+        # per neighbour however many carriers fly it. Those minima can come
+        # from different flights, so totals and Pareto labels are charged
+        # from one flight per leg instead. A pair is built either from
+        # flights or with add_edge, not both. Returns the flight id.
+        if self.edges is None:
+            self.edges = EdgeStore()
+        edge_id = self.edges.add(src, dest, carrier, distance,
+                                 DEFAULT_EDGE_METRICS[0] if time is None else time,
+                                 DEFAULT_EDGE_METRICS[1] if cost is None else cost,
+                                 both_directions=not self.directed)
+        self._collapse(src, dest)
+        return edge_id
+
+    def remove_flight(self, edge_id):
+        # Returns the dynamic-route answers that changed, as remove_edge does.
+        edge = self.edges.remove(edge_id)
+        return self._collapse(edge.src, edge.dest)
+
+    def _collapse(self, src, dest):
+        distance = self.edges.minimum(src, dest, "distance")
+        if distance is None:
+            return self.remove_edge(src, dest) if dest in self.vertices[src] else []
+        old_weight = self.vertices[src].get(dest)
+        self._store_edge(src, dest, distance,
+                         self.edges.minimum(src, dest, "time"), self.edges.minimum(src, dest, "cost"))
+        return self._edge_changed(src, dest, old_weight, distance)
+
+    def path_edges(self, path, metric="distance"):
+        # The flight id taken on each leg: the best one by metric, or None
+        # for legs added with add_edge.
+        return [self.edges.best(src, dest, metric) for src, dest in zip(path, path[1:])]
+
+    def add_network(self, airports, routes):
+        # Bulk build from (name, latitude, longitude) and (src, dest, weight,
+        # time, cost) rows: the version moves once and a route table is
+        # rebuilt once instead of being patched edge by edge.
+        for name, latitude, longitude in airports:
+            self.vertices.setdefault(name, {})
+            if self.directed:
+                self.reverse.setdefault(name, {})
+            if latitude is not None and longitude is not None:
+                self.coordinates[name] = (latitude, longitude)
+        for src, dest, weight, time, cost in routes:
+            self._store_edge(src, dest, weight, time, cost)
+        self.version += 1
+        if self.route_table:
+            self.enable_route_table(self.route_table_limit)
+
+    def add_adjacency(self, adjacency, coordinates=None, edge_metrics=None):
+        # Installs ready-made adjacency maps, e.g. from a snapshot, which
+        # already hold both directions of every route.
+        self.vertices.update(adjacency)
+        if self.directed:
+            self.reverse = {name: {} for name in self.vertices}
+            for src, connections in self.vertices.items():
+                for dest, weight in connections.items():
+                    self.reverse[dest][src] = weight
+        self.coordinates.update(coordinates or {})
+        self.edge_metrics.update(edge_metrics or {})
+        self.version += 1
+        if self.route_table:
+            self.enable_route_table(self.route_table_limit)
+
+    def route_totals(self, path, edge_ids=None):
+        # With edge_ids each leg is charged for that flight rather than the
+        # best per metric in the adjacency.
+        distance = time = cost = 0
+        for leg, (src, dest) in enumerate(zip(path, path[1:])):
+            if edge_ids and edge_ids[leg] is not None:
+                edge = self.edges.edge(edge_ids[leg])
+                distance += edge.distance
+                time += edge.time
+                cost += edge.cost
+                continue
+            leg_time, leg_cost = self.edge_metrics.get((src, dest), DEFAULT_EDGE_METRICS)
+            distance += self.vertices[src][dest]
+            time += leg_time
+            cost += leg_cost
+        return distance, time, BASE_FARE + cost
+
+    def reverse_vertices(self):
+        return self.reverse if self.directed else self.vertices
+
+    def enable_route_table(self, max_vertices=ROUTE_TABLE_MAX_VERTICES):
+        # Above the limit the table would cost too much memory, so queries
+        # fall back to searching on demand.
+        self.route_table_limit = max_vertices
+        if len(self.vertices) > max_vertices:
+            self.route_table = None
+        else:
+            self.route_table = RouteTable(self)
+        return self.route_table is not None
+
+    def disable_route_table(self):
+        self.route_table = None
+
+    def enable_route_cache(self, maxsize=1024, ttl=None):
+        self.route_cache = RouteCache(maxsize, ttl)
+        return self.route_cache
+
+    def enable_dynamic_routes(self, max_sources=DEFAULT_MAX_SOURCES):
+        # Keeps shortest-path trees for recently asked sources and repairs
+        # them on edge updates instead of searching again.
+        self.dynamic_routes = DynamicRoutes(self, max_sources)
+        return self.dynamic_routes
+
+    def enable_time_profiles(self):
+        if self.time_profiles is None:
+            self.time_profiles = EdgeProfiles(self)
+        return self.time_profiles
+
+    def use_contraction_hierarchy(self, hierarchy=None):
+        if hierarchy is None:
+            hierarchy = build_hierarchy(self)
+        self.hierarchy = hierarchy
+        self.hierarchy_version = self.version
+        return hierarchy
+
+    def compact(self):
+        if self.compact_graph is None or self.compact_graph.version != self.version:
+            self.compact_graph = CompactGraph.from_graph(self)
+        return self.compact_graph
+
+    def shortest_path(self, source, destination):
+        if source not in self.vertices or destination not in self.vertices:
+            return RouteResult(source, destination, float('inf'), [])
+
+        # Distances are filled lazily and the search stops once the destination
+        # is settled, so point-to-point queries skip the rest of the network.
+        distances = {source: 0}
+        previous = {}
+        settled = set()
+        priority_queue = [(0, source)]
+
+        while priority_queue:
+            current_distance, current_vertex = heapq.heappop(priority_queue)
+
+            if current_vertex in settled:
+                continue
+            settled.add(current_vertex)
+
+            if current_vertex == destination:
+                path = reconstruct_path(previous, source, destination)
+                return RouteResult(source, destination, current_distance, path, len(settled))
+
+            for neighbor, weight in self.vertices[current_vertex].items():
+                distance = current_distance + weight
+
+                if neighbor not in settled and distance < distances.get(neighbor, float('inf')):
+                    distances[neighbor] = distance
+                    previous[neighbor] = current_vertex
+                    heapq.heappush(priority_queue, (distance, neighbor))
+
+        return RouteResult(source, destination, float('inf'), [], len(settled))
+
+def dijkstra(graph, start):
+    distances = {vertex: float('inf') for vertex in graph.vertices}
+    distances[start] = 0
+    priority_queue = [(0, start)]
+
+    while priority_queue:
+        current_distance, current_vertex = heapq.heappop(priority_queue)
+
+        if current_distance > distances[current_vertex]:
+            continue
+
+        for neighbor, weight in graph.vertices[current_vertex].items():
+            distance = current_distance + weight
+
+            if distance < distances[neighbor]:
+                distances[neighbor] = distance
+                heapq.heappush(priority_queue, (distance, neighbor))
+
+    return distances
+
+def list_all_airports(graph):
+    airports = list(graph.vertices.keys())
+    formatted_airports = "\n".join(f"{i + 1}. {airport}" for i, airport in enumerate(airports))
+    return formatted_airports
+
+def show_flight_map(graph):
+    lines = ["*" * 60, "        Flight Map", "       ------------------", "-" * 50]
+
+    for airport, connections in graph.vertices.items():
+        line = f"\n{airport} =>"
+
+        for neighbor, weight in connections.items():
+            line += f"\n\t{neighbor:<25} {weight}"
+
+        lines.append(line)
+
+    lines.extend(["-" * 50, "-" * 50])
+    return "\n".join(lines)
+
+class RouteResult:
+    def __init__(self, source, destination, distance, path, settled=None):
+        self.source = source
+        self.destination = destination
+        self.distance = distance
+        self.path = path
+        self.settled = settled
+        self.time = time_for_legs(len(path) - 1) if path else None
+        self.fare = fare_for_legs(len(path) - 1) if path else None
+        self.departure = None
+        self.arrival = None
+        self.edges = None
+
+    @property
+    def found(self):
+        return bool(self.path)
+
+class RouteQuery:
+    # One search per (source, destination) answers distance, path, time and fare together.
+    def __init__(self, graph):
+        self.graph = graph
+
+    def find_route(self, source_name, destination_name, metric="distance", strategy="dijkstra"):
+        if strategy not in ROUTE_STRATEGIES:
+            raise ValueError(f"Unknown route strategy: {strategy}")
+        if metric not in METRICS:
+            raise ValueError(f"Unknown route metric: {metric}")
+
+        cache = self.graph.route_cache
+        if cache:
+            key = (source_name, destination_name, metric, strategy, self.graph.version)
+            route = cache.get(key)
+            if route is None:
+                route = self.search(source_name, destination_name, strategy, metric)
+                cache.put(key, route)
+            return route
+
+        return self.search(source_name, destination_name, strategy, metric)
+
+    def search(self, source_name, destination_name, strategy="dijkstra", metric="distance"):
+        table = self.graph.route_table
+
+        if metric != "distance":
+            # The coordinate bounds, table and hierarchy are all built on
+            # distance, so time and cost always use the single-metric search.
+            _, path, settled = metric_shortest_path(self.graph, source_name, destination_name, metric)
+            route = RouteResult(source_name, destination_name, float('inf'), path, settled)
+        elif strategy != "dijkstra":
+            distance, path, settled = ROUTE_STRATEGIES[strategy](self.graph, source_name, destination_name)
+            route = RouteResult(source_name, destination_name, distance, path, settled)
+        elif table and source_name in table.index and destination_name in table.index:
+            distance, path = table.lookup(source_name, destination_name)
+            route = RouteResult(source_name, destination_name, distance, path, 0)
+        elif self.graph.dynamic_routes and source_name in self.graph.vertices and destination_name in self.graph.vertices:
+            distance, path = self.graph.dynamic_routes.lookup(source_name, destination_name)
+            route = RouteResult(source_name, destination_name, distance, path, 0)
+        else:
+            route = self.graph.shortest_path(source_name, destination_name)
+
+        if route.found:
+            if self.graph.edges is not None:
+                route.edges = self.graph.path_edges(route.path, metric)
+            route.distance, route.time, route.fare = self.graph.route_totals(route.path, route.edges)
+        return route
+
+    def find_route_at(self, source_name, destination_name, departure):
+        # Earliest arrival when leaving at departure (minutes), using the
+        # graph's time profiles and closures. Not cached: the answer moves
+        # with the departure time and every restriction update.
+        arrival, path, settled = time_dependent_path(
+            self.graph, self.graph.time_profiles, source_name, destination_name, departure)
+        route = RouteResult(source_name, destination_name, float('inf'), path, settled)
+        route.departure = departure
+        if route.found:
+            route.distance, _, route.fare = self.graph.route_totals(path)
+            route.time = arrival - departure
+            route.arrival = arrival
+        return route
+
+    def alternatives(self, source_name, destination_name, max_detour=None, metric="distance"):
+        # Loopless routes, best first, generated as they are pulled; stop
+        # iterating once enough have been offered.
+        for _, path in k_shortest_paths(self.graph, source_name, destination_name, max_detour, metric):
+            route = RouteResult(source_name, destination_name, float('inf'), path)
+            if self.graph.edges is not None:
+                route.edges = self.graph.path_edges(path, metric)
+            route.distance, route.time, route.fare = self.graph.route_totals(path, route.edges)
+            yield route
+
+    def pareto(self, source_name, destination_name, max_labels=None):
+        return pareto_routes(self.graph, source_name, destination_name, max_labels)
+
+    def lookup(self, source, destination, strategy="dijkstra", metric="distance"):
+        source_name = get_airport_name(source.upper(), self.graph)
+        destination_name = get_airport_name(destination.upper(), self.graph)
+
+        if not source_name or not destination_name:
+            return None
+
+        return self.find_route(source_name, destination_name, metric, strategy)
+
+ROUTE_STRATEGIES = {
+    "dijkstra": None,
+    "astar": astar,
+    "bidirectional": bidirectional_dijkstra,
+    "contraction": hierarchy_search,
+}
+
+INVALID_CODES_MESSAGE = "Invalid airport code(s). Please enter valid codes."
+
+def format_distance(route):
+    if route is None:
+        return INVALID_CODES_MESSAGE
+    if not route.found:
+        return f"No path found from {route.source} to {route.destination}."
+    return f"SHORTEST DISTANCE FROM {route.source} TO {route.destination} IS {route.distance}KM"
+
+def format_time(route):
+    if route is None:
+        return INVALID_CODES_MESSAGE
+    if not route.found:
+        return f"No path found from {route.source} to {route.destination}."
+    return f"TIME FROM {route.source} TO {route.destination} IS {route.time} MINUTES"
+
+def format_fare(route):
+    if route is None:
+        return INVALID_CODES_MESSAGE
+    if not route.found:
+        return f"No path found from {route.source} to {route.destination}."
+    return f"FARE FROM {route.source} TO {route.destination}  {route.fare} RUPEES"
+
+def get_shortest_distance(graph, source, destination):
+    return format_distance(RouteQuery(graph).lookup(source, destination))
+
+def get_shortest_time(graph, source, destination):
+    return format_time(RouteQuery(graph).lookup(source, destination))
+
+def get_shortest_path_distance(graph, source, destination):
+    return RouteQuery(graph).find_route(source, destination).path
+
+def showpath(graph, source, destination):
+    route = RouteQuery(graph).lookup(source, destination)
+
+    if route is None:
+        return INVALID_CODES_MESSAGE
+
+    return route.path
+
+def is_valid_airport(graph, input_value, input_type):
+    if input_type == "code":
+        return get_airport_name(input_value, graph) in graph.vertices
+    return False
+def get_airport_name(airport_code, graph=None):
+    # Codes come from the network the graph was loaded from, or the bundled one.
+    index = graph.airports if graph is not None and graph.airports is not None else default_airport_index()
+    return index.name(airport_code)
+
+def fareCalculator(graph, source, destination):
+    return format_fare(RouteQuery(graph).lookup(source, destination))
+
+class FareTable:
+    # Fares per (source, destination) code pair, searched once and reused
+    # until the graph changes. None means invalid codes or no route.
+    def __init__(self, graph):
+        self.graph = graph
+        self.fares = {}
+        self.version = graph.version
+
+    def fare(self, source, destination):
+        if self.version != self.graph.version:
+            self.fares.clear()
+            self.version = self.graph.version
+        key = (source, destination)
+        if key not in self.fares:
+            route = RouteQuery(self.graph).lookup(source, destination)
+            self.fares[key] = route.fare if route and route.found else None
+        return self.fares[key]
+
+
+class TicketBookingSystem:
+    # The system sells one pool of seats, so it keeps its waitlist under a single flight key.
+    # With a seat inventory, a ticket on a dated route also takes a seat on each of its legs.
+    WAITLIST_FLIGHT = None
+
+    def __init__(self, total_tickets, journal=None, fare_table=None, inventory=None):
+        self.total_tickets = total_tickets
+        self.fare_table = fare_table
+        self.inventory = None
+        self.seat_reservations = {}
+        self.available_tickets = total_tickets
+        self.tickets_issued = 0
+        self.passenger_records = PassengerStore()
+        self.waitlist = Waitlist()
+        self.passenger_details = {}
+        self.history = BookingHistory()
+        self.journal = None
+        if inventory is not None:
+            self.attach_inventory(inventory)
+        if journal is not None:
+            self.attach_journal(journal)
+
+    def attach_inventory(self, inventory):
+        # Ticket holders already booked take their seats in the new inventory.
+        self.release_seats(self.seat_reservations.values())
+        self.seat_reservations = {}
+        self.inventory = inventory
+        for ticket_number, passenger in self.passenger_records.by_ticket.items():
+            reservation_id = self.reserve_seat(passenger)
+            if reservation_id is not None:
+                self.seat_reservations[ticket_number] = reservation_id
+
+    def reserve_seat(self, passenger):
+        if self.inventory is None or passenger.date is None or not passenger.route:
+            return None
+        return self.inventory.reserve_path(passenger.route, passenger.date).reservation_id
+
+    def reserve_seats(self, passengers):
+        # All or nothing: raises SeatsUnavailable with every seat given back.
+        reservations = []
+        try:
+            for passenger in passengers:
+                reservations.append(self.reserve_seat(passenger))
+        except BaseException:
+            self.release_seats(reservations)
+            raise
+        return reservations
+
+    def release_seats(self, reservations):
+        for reservation_id in reservations:
+            if reservation_id is not None:
+                self.inventory.cancel(reservation_id)
+
+    def attach_journal(self, journal):
+        # Rebuilds the bookings from the journal's snapshot and replays the
+        # events logged after it; from then on every change is logged first.
+        state, records = journal.recover()
+        if state is not None:
+            self.restore_state(state)
+        for record in records:
+            self.apply(record)
+        self.journal = journal
+        if state is None and not records:
+            # A new journal starts with the seat count, so replay does not depend on the caller's.
+            self.log("capacity", total_tickets=self.total_tickets)
+
+    def log(self, op, **fields):
+        if self.journal is None:
+            return
+        if self.journal.needs_snapshot():
+            self.journal.snapshot(self.snapshot_state())
+        fields["op"] = op
+        self.journal.append(fields)
+
+    def apply(self, record):
+        op = record["op"]
+        if op == "capacity":
+            self.total_tickets = self.available_tickets = record["total_tickets"]
+        elif op == "book":
+            passengers = [Passenger(**fields) for fields in record["passengers"]]
+            self.book_tickets(record["num_tickets"], passengers, record["tier"])
+        elif op == "promote":
+            self.process_waiting_list(record["num_tickets"])
+        elif op == "cancel":
+            self.cancel_booking(record["name"])
+        elif op == "waitlist":
+            self.add_to_waitlist(record["names"], record["tier"])
+        elif op == "add":
+            self.add_passenger(Passenger(**record["passenger"]))
+        else:
+            raise ValueError(f"Unknown journal record: {op}")
+
+    def snapshot_state(self):
+        return {
+            'total_tickets': self.total_tickets,
+            'available_tickets': self.available_tickets,
+            'tickets_issued': self.tickets_issued,
+            'passengers': list(self.passenger_records),
+            'passenger_details': self.passenger_details,
+            # A name booked twice has one entry in passenger_details but two live tickets.
+            'tickets': list(self.passenger_records.by_ticket),
+            'waitlist': list(self.waitlist.tiered(self.WAITLIST_FLIGHT)),
+        }
+
+    def restore_state(self, state):
+        self.total_tickets = state['total_tickets']
+        self.available_tickets = state['available_tickets']
+        self.tickets_issued = state['tickets_issued']
+        self.passenger_details = state['passenger_details']
+        self.passenger_records = PassengerStore()
+        for fields in state['passengers']:
+            self.passenger_records.add_passenger(Passenger(**fields))
+        # Cancelled tickets stay in the booking history but not in the ticket index.
+        if 'tickets' in state:
+            active = set(state['tickets'])
+        else:
+            active = {details['ticket_number'] for details in self.passenger_details.values()}
+        for ticket_number in list(self.passenger_records.by_ticket):
+            if ticket_number not in active:
+                del self.passenger_records.by_ticket[ticket_number]
+        self.history = BookingHistory()
+        for passenger in self.passenger_records:
+            if self.passenger_records.by_ticket.get(passenger.ticket_number) is passenger:
+                self.history.add(passenger)
+        self.waitlist = Waitlist()
+        for tier, fields in state['waitlist']:
+            self.waitlist.add(self.WAITLIST_FLIGHT, Passenger(**fields), tier)
+        if self.inventory is not None:
+            self.attach_inventory(self.inventory)
+
+    def book_tickets(self, num_tickets, passengers, tier=TIER_STANDARD):
+        # Fares are fixed when the booking is made and journalled with it.
+        if self.fare_table is not None:
+            for passenger in passengers:
+                if passenger.fare is None:
+                    passenger.fare = self.fare_table.fare(passenger.source_airport, passenger.destination_airport)
+        # Seats are taken before anything is logged, so a sold-out leg
+        # leaves no trace of the booking.
+        available = self.available_tickets
+        issued = passengers[:min(num_tickets, available)]
+        reservations = self.reserve_seats(issued)
+        try:
+            self.log("book", num_tickets=num_tickets, tier=tier, passengers=passengers)
+        except BaseException:
+            self.release_seats(reservations)
+            raise
+        self.issue_tickets(issued, reservations)
+        if num_tickets <= available:
+            return True, []
+        else:
+            waiting_list = passengers[len(issued):]
+            self.waitlist.extend(self.WAITLIST_FLIGHT, waiting_list, tier)
+            return False, waiting_list
+
+    def issue_tickets(self, passengers, reservations=None):
+        # Ticket numbers keep counting across bookings and cancellations so each one stays unique.
+        for i, passenger in enumerate(passengers):
+            self.tickets_issued += 1
+            passenger.ticket_number = f"Ticket {self.tickets_issued}"
+            if reservations and reservations[i] is not None:
+                self.seat_reservations[passenger.ticket_number] = reservations[i]
+            self.passenger_records.add_passenger(passenger)
+            self.history.add(passenger)
+            self.passenger_details[passenger.name] = {
+                'ticket_number': passenger.ticket_number,
+                'source_airport': passenger.source_airport,
+                'destination_airport': passenger.destination_airport,
+                'fare': passenger.fare
+            }
+            self.available_tickets -= 1
+
+    def check_ticket_availability(self):
+        return self.available_tickets
+
+    def get_passenger_details(self, passenger_name):
+        passenger = self.passenger_records.find_passenger(passenger_name)
+        if passenger is None:
+            return "Passenger not found"
+        ticket_details = self.passenger_details.get(passenger_name, {}).get('ticket_number', '')
+        return passenger_name, passenger.age, passenger.phone, ticket_details
+
+    def add_passenger(self, passenger):
+        self.log("add", passenger=passenger)
+        self.passenger_records.add_passenger(passenger)
+
+    def process_waiting_list(self, num_tickets):
+        self.log("promote", num_tickets=num_tickets)
+        return self._promote(num_tickets)
+
+    def _promote(self, num_tickets):
+        # Offers up to num_tickets free seats to the waitlist, highest tier first.
+        seats = min(num_tickets, self.available_tickets)
+        reservations = []
+
+        def take_seats(passenger):
+            # Passengers whose legs are sold out keep their place in the queue.
+            try:
+                reservations.append(self.reserve_seat(passenger))
+            except SeatsUnavailable:
+                return False
+            return True
+
+        promoted = self.waitlist.promote(self.WAITLIST_FLIGHT, seats,
+                                         take_seats if self.inventory is not None else None)
+        if promoted:
+            self.issue_tickets(promoted, reservations)
+            return True, promoted
+        else:
+            return False, []
+
+    def cancel_booking(self, passenger_name):
+        # A ticket holder gives the seat back to the waitlist; a passenger
+        # still waiting just leaves the queue.
+        if passenger_name not in self.passenger_details:
+            if (self.WAITLIST_FLIGHT, passenger_name) not in self.waitlist.entries:
+                return False, []
+            self.log("cancel", name=passenger_name)
+            self.waitlist.remove(self.WAITLIST_FLIGHT, passenger_name)
+            return True, []
+        self.log("cancel", name=passenger_name)
+        details = self.passenger_details.pop(passenger_name)
+        self.passenger_records.by_ticket.pop(details['ticket_number'], None)
+        reservation_id = self.seat_reservations.pop(details['ticket_number'], None)
+        if reservation_id is not None:
+            self.inventory.cancel(reservation_id)
+        self.history.remove(details['ticket_number'])
+        self.available_tickets += 1
+        _, promoted = self._promote(1)
+        return True, promoted
+
+    def add_to_waitlist(self, passenger_names, tier=TIER_STANDARD):
+        # Only known passengers without a ticket or a place in the queue can
+        # wait; the names refused are returned.
+        waiting, refused = [], []
+        for name in passenger_names:
+            passenger = self.passenger_records.find_passenger(name)
+            if (passenger is None or name in self.passenger_details or name in waiting
+                    or (self.WAITLIST_FLIGHT, name) in self.waitlist.entries):
+                refused.append(name)
+            else:
+                waiting.append(name)
+        if waiting:
+            self.log("waitlist", names=waiting, tier=tier)
+            for name in waiting:
+                # The queue gets its own copy: promotion issues a ticket to it,
+                # which must not rewrite the record it was made from.
+                record = self.passenger_records.find_passenger(name)
+                self.waitlist.add(self.WAITLIST_FLIGHT, Passenger(
+                    record.name, record.age, record.phone, record.source_airport,
+                    record.destination_airport, fare=record.fare, date=record.date, route=record.route), tier)
+        return not refused, refused
+
+    def close(self):
+        if self.journal is not None:
+            self.journal.close()
+
+def build_flight_map(graph):
+    return load_network(graph)
@@ -0,0 +1,114 @@
+from array import array
+from collections import namedtuple
+
+from airport_data import whole
+
+Edge = namedtuple("Edge", "edge_id src dest carrier distance time cost")
+
+EDGE_METRICS = ("distance", "time", "cost")
+
+
+class EdgeStore:
+    # Every flight under its own id, stored column by column: the numbers in
+    # arrays and carriers as indexes into one list of names, so a big network
+    # costs a few dozen bytes per flight rather than an object each. by_pair
+    # lists the ids flying each (src, dest) direction.
+    def __init__(self):
+        self.sources = []
+        self.destinations = []
+        self.carriers = array('i')
+        self.distances = array('d')
+        self.times = array('d')
+        self.costs = array('d')
+        self.carrier_names = []
+        self.carrier_ids = {}
+        self.by_pair = {}
+        self.count = 0
+
+    def add(self, src, dest, carrier, distance, time, cost, both_directions=False):
+        edge_id = len(self.sources)
+        if carrier is None:
+            carrier_id = -1
+        else:
+            carrier_id = self.carrier_ids.get(carrier)
+            if carrier_id is None:
+                carrier_id = self.carrier_ids[carrier] = len(self.carrier_names)
+                self.carrier_names.append(carrier)
+
+        self.sources.append(src)
+        self.destinations.append(dest)
+        self.carriers.append(carrier_id)
+        self.distances.append(distance)
+        self.times.append(time)
+        self.costs.append(cost)
+        self.by_pair.setdefault((src, dest), []).append(edge_id)
+        if both_directions and src != dest:
+            self.by_pair.setdefault((dest, src), []).append(edge_id)
+        self.count += 1
+        return edge_id
+
+    def restore(self, edge_id, src, dest, carrier, distance, time, cost, both_directions=False):
+        # Adds a saved flight back under its own id; the ids of flights
+        # removed before the save stay empty.
+        if edge_id < len(self.sources):
+            raise ValueError(f"Flight id {edge_id} is already taken")
+        while len(self.sources) < edge_id:
+            self.sources.append(None)
+            self.destinations.append(None)
+            self.carriers.append(-1)
+            for column in (self.distances, self.times, self.costs):
+                column.append(0)
+        return self.add(src, dest, carrier, distance, time, cost, both_directions)
+
+    def remove(self, edge_id):
+        edge = self.edge(edge_id)
+        for pair in ((edge.src, edge.dest), (edge.dest, edge.src)):
+            ids = self.by_pair.get(pair)
+            if ids and edge_id in ids:
+                ids.remove(edge_id)
+                if not ids:
+                    del self.by_pair[pair]
+        # Ids are never reused; the slot is only marked as gone.
+        self.sources[edge_id] = None
+        self.count -= 1
+        return edge
+
+    def edge(self, edge_id):
+        if not 0 <= edge_id < len(self.sources) or self.sources[edge_id] is None:
+            raise KeyError(f"No flight with id {edge_id}")
+        carrier_id = self.carriers[edge_id]
+        return Edge(edge_id, self.sources[edge_id], self.destinations[edge_id],
+                    self.carrier_names[carrier_id] if carrier_id >= 0 else None,
+                    whole(self.distances[edge_id]), whole(self.times[edge_id]), whole(self.costs[edge_id]))
+
+    def flights(self):
+        # Every flight still flying, in id order.
+        return [self.edge(edge_id) for edge_id, src in enumerate(self.sources) if src is not None]
+
+    def between(self, src, dest):
+        return [self.edge(edge_id) for edge_id in self.by_pair.get((src, dest), ())]
+
+    def column(self, metric):
+        if metric not in EDGE_METRICS:
+            raise ValueError(f"Unknown route metric: {metric}")
+        return (self.distances, self.times, self.costs)[EDGE_METRICS.index(metric)]
+
+    def best(self, src, dest, metric="distance"):
+        # The id of the cheapest flight from src to dest by one metric, or None.
+        ids = self.by_pair.get((src, dest))
+        if not ids:
+            return None
+        values = self.column(metric)
+        return min(ids, key=values.__getitem__)
+
+    def minimum(self, src, dest, metric):
+        edge_id = self.best(src, dest, metric)
+        return None if edge_id is None else whole(self.column(metric)[edge_id])
+
+    def __len__(self):
+        return self.count
+
+    def memory_usage(self):
+        return (sum(column.buffer_info()[1] * column.itemsize
+                    for column in (self.carriers, self.distances, self.times, self.costs))
+                + 2 * 8 * len(self.sources))
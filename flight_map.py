@@ -0,0 +1,193 @@
+import argparse
+import random
+import threading
+
+LAYOUT_SEED = 42
+NODE_LABEL_LIMIT = 300
+EDGE_LABEL_LIMIT = 150
+
+
+class MapLayout:
+    # Node positions for the flight map, kept between draws. Airports with
+    # coordinates sit at (longitude, latitude). The rest get a seeded spring
+    # layout around the airports already placed, and only airports that are
+    # new or whose connections changed since the last update move.
+    def __init__(self, graph, seed=LAYOUT_SEED):
+        self.graph = graph
+        self.seed = seed
+        self.positions = {}
+        self.neighbors = {}
+        self.version = None
+        self.placed = 0
+        self.lock = threading.Lock()
+
+    def update(self):
+        # A cancelled draw can still be running on one worker thread when
+        # the next starts on another, so updates take turns and each caller
+        # gets its own copy of the positions.
+        with self.lock:
+            return dict(self._update())
+
+    def _update(self):
+        graph = self.graph
+        if self.version == graph.version:
+            self.placed = 0
+            return self.positions
+
+        for name in list(self.positions):
+            if name not in graph.vertices:
+                del self.positions[name]
+                self.neighbors.pop(name, None)
+
+        reverse = graph.reverse_vertices()
+        stale = []
+        for name, connections in graph.vertices.items():
+            coordinates = graph.coordinates.get(name)
+            if coordinates is not None:
+                latitude, longitude = coordinates
+                self.positions[name] = (longitude, latitude)
+                self.neighbors.pop(name, None)
+                continue
+            around = frozenset(connections).union(reverse.get(name, ()))
+            if name not in self.positions or self.neighbors.get(name) != around:
+                self.neighbors[name] = around
+                stale.append(name)
+
+        if stale:
+            self.place(stale)
+        self.version = graph.version
+        self.placed = len(stale)
+        return self.positions
+
+    def place(self, stale):
+        import networkx as nx
+
+        stale_set = set(stale)
+        if len(stale_set) == len(self.graph.vertices):
+            # Nothing to anchor to: lay the whole network out once.
+            for name, (x, y) in nx.spring_layout(self.graph_view(self.graph.vertices), seed=self.seed).items():
+                self.positions[name] = (float(x), float(y))
+            return
+
+        # Only the stale airports and the neighbours holding them in place
+        # take part, so an edit costs the same on a small or huge network.
+        anchors = {n for name in stale for n in self.neighbors[name] if n not in stale_set and n in self.positions}
+        spread = extent(self.positions[name] for name in self.positions if name not in stale_set)
+        center = centroid(self.positions[name] for name in self.positions if name not in stale_set)
+        initial = {name: self.positions[name] for name in anchors}
+        for name in stale:
+            if name in self.positions:
+                initial[name] = self.positions[name]
+                continue
+            # New airports start next to their placed neighbours, jittered by a
+            # generator seeded with the name so the result repeats run to run.
+            x, y = centroid([self.positions[n] for n in self.neighbors[name] if n in anchors] or [center])
+            jitter = random.Random(f"{self.seed}:{name}")
+            initial[name] = (x + jitter.uniform(-0.05, 0.05) * spread, y + jitter.uniform(-0.05, 0.05) * spread)
+
+        # spring_layout scales its spacing to a unit square on its own; with
+        # fixed airports it has to match their spread instead.
+        G = self.graph_view(stale_set | anchors)
+        k = spread / max(len(self.positions), 1) ** 0.5
+        positions = nx.spring_layout(G, pos=initial, fixed=list(anchors) or None, k=k, seed=self.seed,
+                                     center=None if anchors else initial[stale[0]], scale=k * len(G) ** 0.5)
+        for name in stale:
+            x, y = positions[name]
+            self.positions[name] = (float(x), float(y))
+
+    def graph_view(self, names):
+        import networkx as nx
+
+        G = nx.Graph()
+        G.add_nodes_from(names)
+        for src in names:
+            for dest in self.graph.vertices[src]:
+                if dest in names:
+                    G.add_edge(src, dest)
+        return G
+
+
+def extent(points):
+    points = list(points)
+    if not points:
+        return 1.0
+    xs = [x for x, _ in points]
+    ys = [y for _, y in points]
+    return max(max(xs) - min(xs), max(ys) - min(ys)) or 1.0
+
+
+def centroid(points):
+    points = list(points)
+    if not points:
+        return 0.0, 0.0
+    return sum(x for x, _ in points) / len(points), sum(y for _, y in points) / len(points)
+
+
+def map_edges(graph):
+    # Each airport pair once, however many directions it is flown in.
+    seen = set()
+    for src, connections in graph.vertices.items():
+        for dest, weight in connections.items():
+            if (dest, src) in seen:
+                continue
+            seen.add((src, dest))
+            yield src, dest, weight
+
+
+def draw_flight_map(graph, positions, axes, title="Flight Reservation System"):
+    # All edges go into one LineCollection, so thousands of routes draw as a
+    # single artist; labels are skipped once they would only be clutter.
+    from matplotlib.collections import LineCollection
+
+    edges = list(map_edges(graph))
+    segments = [(positions[src], positions[dest]) for src, dest, _ in edges]
+    axes.add_collection(LineCollection(segments, colors="gray", linewidths=0.8, zorder=1))
+
+    names = list(positions)
+    if names:
+        xs = [positions[name][0] for name in names]
+        ys = [positions[name][1] for name in names]
+        axes.scatter(xs, ys, s=500 if len(names) <= 100 else 20, color="#1f78b4", zorder=2)
+
+    if len(names) <= NODE_LABEL_LIMIT:
+        for name in names:
+            x, y = positions[name]
+            axes.text(x, y, name, fontsize=8, fontweight="bold", ha="center", va="center", zorder=3)
+
+    if len(edges) <= EDGE_LABEL_LIMIT:
+        for (src, dest, weight), ((x1, y1), (x2, y2)) in zip(edges, segments):
+            axes.text((x1 + x2) / 2, (y1 + y2) / 2, f"{weight}KM", fontsize=6, ha="center", va="center",
+                      zorder=3, bbox={"boxstyle": "round", "fc": "white", "ec": "none", "alpha": 0.7})
+
+    axes.autoscale_view()
+    axes.set_title(title)
+    axes.set_axis_off()
+
+
+def save_flight_map(graph, path, layout=None, dpi=150):
+    # Renders without pyplot or a display; the format follows the file
+    # extension (.png, .svg, .pdf).
+    from matplotlib.figure import Figure
+
+    positions = (layout or MapLayout(graph)).update()
+    figure = Figure(figsize=(12, 9))
+    draw_flight_map(graph, positions, figure.add_subplot())
+    figure.savefig(path, dpi=dpi, bbox_inches="tight")
+    return path
+
+
+def main():
+    from flight_core import Graph, build_flight_map
+
+    parser = argparse.ArgumentParser(description="Render the flight map to an image file without a display.")
+    parser.add_argument("output", help="image file to write, e.g. map.png or map.svg")
+    parser.add_argument("--dpi", type=int, default=150)
+    args = parser.parse_args()
+
+    graph = Graph()
+    build_flight_map(graph)
+    print(save_flight_map(graph, args.output, dpi=args.dpi))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+from collections import namedtuple
+from itertools import count
+import threading
+
+DEFAULT_SEATS_PER_LEG = 200
+DEFAULT_LOCK_STRIPES = 64
+
+Leg = namedtuple("Leg", "flight date origin destination")
+
+
+class SeatsUnavailable(Exception):
+    def __init__(self, leg, requested, available):
+        super().__init__(f"Only {available} seat(s) left on {leg.flight} {leg.origin}->{leg.destination} "
+                         f"on {leg.date}, {requested} requested")
+        self.leg = leg
+        self.requested = requested
+        self.available = available
+
+
+class Reservation:
+    __slots__ = ("reservation_id", "legs", "seats")
+
+    def __init__(self, reservation_id, legs, seats):
+        self.reservation_id = reservation_id
+        self.legs = legs
+        self.seats = seats
+
+
+def legs_for_path(path, date, flights=None):
+    # Without a schedule every airport pair counts as one flight per day.
+    pairs = list(zip(path, path[1:]))
+    if flights is None:
+        flights = [f"{origin}-{destination}" for origin, destination in pairs]
+    return [Leg(flight, date, origin, destination) for flight, (origin, destination) in zip(flights, pairs)]
+
+
+class SeatInventory:
+    # Seat counts per (flight, date, leg). Each leg hashes to one of a fixed
+    # set of locks, so bookings on unrelated legs never wait for each other.
+    def __init__(self, seats_per_leg=DEFAULT_SEATS_PER_LEG, stripes=DEFAULT_LOCK_STRIPES):
+        self.seats_per_leg = seats_per_leg
+        self.capacity = {}
+        self.sold = {}
+        self.reservations = {}
+        self.locks = [threading.Lock() for _ in range(stripes)]
+        self.reservation_ids = count(1)
+
+    def add_leg(self, leg, seats=None):
+        self.capacity[leg] = self.seats_per_leg if seats is None else seats
+
+    def available(self, leg):
+        return self.capacity.get(leg, self.seats_per_leg) - self.sold.get(leg, 0)
+
+    def _locks_for(self, legs):
+        # Always taking locks in stripe order keeps multi-leg bookings deadlock-free.
+        stripes = sorted({hash(leg) % len(self.locks) for leg in legs})
+        return [self.locks[stripe] for stripe in stripes]
+
+    def reserve(self, legs, seats=1):
+        legs = list(legs)
+        if seats <= 0:
+            raise ValueError("seats must be positive")
+        if not legs:
+            raise ValueError("a reservation needs at least one leg")
+
+        locks = self._locks_for(legs)
+        for lock in locks:
+            lock.acquire()
+        applied = []
+        try:
+            for leg in legs:
+                available = self.available(leg)
+                if available < seats:
+                    raise SeatsUnavailable(leg, seats, available)
+            for leg in legs:
+                self.sold[leg] = self.sold.get(leg, 0) + seats
+                applied.append(leg)
+        except BaseException:
+            for leg in applied:
+                self.sold[leg] -= seats
+            raise
+        finally:
+            for lock in reversed(locks):
+                lock.release()
+
+        reservation = Reservation(next(self.reservation_ids), tuple(legs), seats)
+        self.reservations[reservation.reservation_id] = reservation
+        return reservation
+
+    def reserve_path(self, path, date, seats=1, flights=None):
+        return self.reserve(legs_for_path(path, date, flights), seats)
+
+    def cancel(self, reservation_id):
+        reservation = self.reservations.pop(reservation_id, None)
+        if reservation is None:
+            return False
+
+        locks = self._locks_for(reservation.legs)
+        for lock in locks:
+            lock.acquire()
+        try:
+            for leg in reservation.legs:
+                self.sold[leg] -= reservation.seats
+        finally:
+            for lock in reversed(locks):
+                lock.release()
+        return True
+
+    def path_availability(self, path, date, flights=None):
+        legs = legs_for_path(path, date, flights)
+        return min((self.available(leg) for leg in legs), default=0)
@@ -0,0 +1,172 @@
+import json
+import os
+import threading
+import time
+import zlib
+
+SNAPSHOT_SUFFIX = ".snapshot"
+DEFAULT_SYNC_EVERY = 64
+DEFAULT_SYNC_INTERVAL = 0.05
+DEFAULT_SNAPSHOT_EVERY = 10000
+
+
+def encode_record(obj):
+    # Passengers and other slotted records are journalled as plain field dicts.
+    return {slot: getattr(obj, slot) for slot in obj.__slots__}
+
+
+def fsync_directory(path):
+    # Makes a rename durable on POSIX; Windows cannot open directories.
+    if not hasattr(os, "O_DIRECTORY"):
+        return
+    descriptor = os.open(os.path.dirname(os.path.abspath(path)), os.O_RDONLY | os.O_DIRECTORY)
+    try:
+        os.fsync(descriptor)
+    finally:
+        os.close(descriptor)
+
+
+class BookingJournal:
+    # Append-only, checksummed log of booking events. Every record reaches the
+    # OS as soon as it is appended, so a crash of the process loses nothing;
+    # fsync is batched (group commit) after sync_every records or once
+    # sync_interval seconds have passed since the last one. A timer syncs the
+    # tail of a burst when no further record arrives, which bounds what a
+    # power loss can take. sync_every=1 syncs every record, 0 only syncs on close.
+    # Every snapshot_every records the owner's state is written to a snapshot
+    # and the log starts over, so replay stays short.
+    def __init__(self, path, sync_every=DEFAULT_SYNC_EVERY, sync_interval=DEFAULT_SYNC_INTERVAL,
+                 snapshot_every=DEFAULT_SNAPSHOT_EVERY):
+        self.path = path
+        self.snapshot_path = path + SNAPSHOT_SUFFIX
+        self.sync_every = sync_every
+        self.sync_interval = sync_interval
+        self.snapshot_every = snapshot_every
+        self.sequence = 0
+        self.pending = 0
+        self.records_since_snapshot = 0
+        self.syncs = 0
+        self.last_sync = time.monotonic()
+        self.handle = None
+        self.timer = None
+        # Appends and the timer's syncs come from different threads.
+        self.lock = threading.RLock()
+
+    def recover(self):
+        # Returns the snapshot state (or None) and the records logged after it.
+        # A torn or corrupt tail from a crash mid-write is cut off.
+        state, snapshot_sequence = None, 0
+        if os.path.exists(self.snapshot_path):
+            with open(self.snapshot_path, "rb") as handle:
+                snapshot = json.loads(handle.read())
+            state, snapshot_sequence = snapshot["state"], snapshot["sequence"]
+
+        records = []
+        good_length = 0
+        if os.path.exists(self.path):
+            with open(self.path, "rb") as handle:
+                for line in handle:
+                    record = self.decode(line)
+                    if record is None:
+                        break
+                    good_length += len(line)
+                    if record["seq"] > snapshot_sequence:
+                        records.append(record)
+            if good_length < os.path.getsize(self.path):
+                with open(self.path, "r+b") as handle:
+                    handle.truncate(good_length)
+
+        self.sequence = records[-1]["seq"] if records else snapshot_sequence
+        self.records_since_snapshot = len(records)
+        self.handle = open(self.path, "ab")
+        return state, records
+
+    def decode(self, line):
+        if not line.endswith(b"\n"):
+            return None
+        checksum, _, payload = line[:-1].partition(b" ")
+        try:
+            if int(checksum, 16) != zlib.crc32(payload):
+                return None
+            return json.loads(payload)
+        except ValueError:
+            return None
+
+    def append(self, record):
+        with self.lock:
+            if self.handle is None:
+                self.recover()
+            self.sequence += 1
+            record["seq"] = self.sequence
+            payload = json.dumps(record, separators=(",", ":"), default=encode_record).encode("utf-8")
+            self.handle.write(b"%08x %s\n" % (zlib.crc32(payload), payload))
+            self.handle.flush()
+            self.pending += 1
+            self.records_since_snapshot += 1
+            if self.sync_every and (self.pending >= self.sync_every
+                                    or time.monotonic() - self.last_sync >= self.sync_interval):
+                self.sync()
+            elif self.sync_every and self.timer is None:
+                self.schedule_sync()
+            return self.sequence
+
+    def schedule_sync(self):
+        delay = max(0, self.last_sync + self.sync_interval - time.monotonic())
+        self.timer = threading.Timer(delay, self.timed_sync)
+        self.timer.daemon = True
+        self.timer.start()
+
+    def timed_sync(self):
+        # Runs on the timer thread. Records synced in the meantime need
+        # nothing; a sync since the timer was set moves the deadline on.
+        with self.lock:
+            self.timer = None
+            if self.handle is None or not self.pending:
+                return
+            if time.monotonic() - self.last_sync >= self.sync_interval:
+                self.sync()
+            else:
+                self.schedule_sync()
+
+    def sync(self):
+        with self.lock:
+            if self.handle is None or not self.pending:
+                return
+            self.handle.flush()
+            os.fsync(self.handle.fileno())
+            self.pending = 0
+            self.syncs += 1
+            self.last_sync = time.monotonic()
+
+    def needs_snapshot(self):
+        return bool(self.snapshot_every) and self.records_since_snapshot >= self.snapshot_every
+
+    def snapshot(self, state):
+        # The snapshot replaces the old one atomically before the log is
+        # emptied; if we crash in between, replay skips the records it covers.
+        with self.lock:
+            temporary = self.snapshot_path + ".tmp"
+            with open(temporary, "wb") as handle:
+                handle.write(json.dumps({"sequence": self.sequence, "state": state},
+                                        separators=(",", ":"), default=encode_record).encode("utf-8"))
+                handle.flush()
+                os.fsync(handle.fileno())
+            os.replace(temporary, self.snapshot_path)
+            fsync_directory(self.snapshot_path)
+
+            if self.handle is not None:
+                self.handle.close()
+            self.handle = open(self.path, "wb")
+            os.fsync(self.handle.fileno())
+            self.pending = 0
+            self.records_since_snapshot = 0
+
+    def close(self):
+        with self.lock:
+            if self.timer is not None:
+                self.timer.cancel()
+                self.timer = None
+            if self.handle is not None:
+                self.sync()
+                self.handle.close()
+                self.handle = None
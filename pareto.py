@@ -0,0 +1,197 @@
+import heapq
+from itertools import count
+
+from fares import BASE_FARE, FARE_PER_LEG, MINUTES_PER_LEG
+
+INF = float('inf')
+METRICS = ("distance", "time", "cost")
+DEFAULT_EDGE_METRICS = (MINUTES_PER_LEG, FARE_PER_LEG)
+
+
+class ParetoRoute:
+    # edges holds the flight id taken on each leg (None for legs added with add_edge).
+    def __init__(self, distance, time, cost, path, edges=None):
+        self.distance = distance
+        self.time = time
+        self.cost = cost
+        self.path = path
+        self.edges = edges
+
+    @property
+    def fare(self):
+        return BASE_FARE + self.cost
+
+    def __repr__(self):
+        return f"ParetoRoute(distance={self.distance}, time={self.time}, cost={self.cost}, path={self.path})"
+
+
+def edge_weights(graph, metric):
+    # Returns weight(src, dest) for one metric; distance reads the adjacency
+    # directly, time and cost fall back to the per-leg defaults. Where several
+    # flights serve a pair this is the best of them for this metric alone.
+    if metric == "distance":
+        vertices = graph.vertices
+        return lambda src, dest: vertices[src][dest]
+    if metric not in METRICS:
+        raise ValueError(f"Unknown route metric: {metric}")
+
+    position = 0 if metric == "time" else 1
+    edge_metrics = graph.edge_metrics
+    return lambda src, dest: edge_metrics.get((src, dest), DEFAULT_EDGE_METRICS)[position]
+
+
+def metric_shortest_path(graph, source, destination, metric):
+    if source not in graph.vertices or destination not in graph.vertices:
+        return INF, [], 0
+
+    weight_of = edge_weights(graph, metric)
+    distances = {source: 0}
+    previous = {}
+    settled = set()
+    priority_queue = [(0, source)]
+
+    while priority_queue:
+        current_value, current_vertex = heapq.heappop(priority_queue)
+
+        if current_vertex in settled:
+            continue
+        settled.add(current_vertex)
+
+        if current_vertex == destination:
+            path = [destination]
+            while path[-1] != source:
+                path.append(previous[path[-1]])
+            path.reverse()
+            return current_value, path, len(settled)
+
+        for neighbor in graph.vertices[current_vertex]:
+            value = current_value + weight_of(current_vertex, neighbor)
+
+            if neighbor not in settled and value < distances.get(neighbor, INF):
+                distances[neighbor] = value
+                previous[neighbor] = current_vertex
+                heapq.heappush(priority_queue, (value, neighbor))
+
+    return INF, [], len(settled)
+
+
+def lower_bounds(graph, destination, metric):
+    # Exact single-metric distances to the destination, searched backwards.
+    weight_of = edge_weights(graph, metric)
+    reverse = graph.reverse_vertices()
+    distances = {destination: 0}
+    priority_queue = [(0, destination)]
+
+    while priority_queue:
+        current_value, current_vertex = heapq.heappop(priority_queue)
+
+        if current_value > distances[current_vertex]:
+            continue
+
+        for neighbor in reverse[current_vertex]:
+            value = current_value + weight_of(neighbor, current_vertex)
+
+            if value < distances.get(neighbor, INF):
+                distances[neighbor] = value
+                heapq.heappush(priority_queue, (value, neighbor))
+
+    return distances
+
+
+def leg_options(graph, weights):
+    # Returns options(src, dest): (distance, time, cost, flight id) for every
+    # flight on the leg, so a route is never charged a mix of two flights.
+    edges = graph.edges
+
+    def options(src, dest):
+        ids = edges.by_pair.get((src, dest)) if edges is not None else None
+        if not ids:
+            return [(weights[0](src, dest), weights[1](src, dest), weights[2](src, dest), None)]
+        return [edges.edge(edge_id)[4:] + (edge_id,) for edge_id in ids]
+
+    return options
+
+
+def dominates(first, second):
+    return first[0] <= second[0] and first[1] <= second[1] and first[2] <= second[2]
+
+
+def pareto_routes(graph, source, destination, max_labels=None):
+    # Label-setting search popping labels in lexicographic (distance, time, cost)
+    # order, so every label that reaches the destination is Pareto-optimal.
+    # A label is dropped when another label at the same airport is at least as
+    # good in every metric, or when its optimistic completion (label plus exact
+    # per-metric bounds) is already matched by a route found to the destination.
+    # max_labels caps the labels kept per airport; with a cap the result can
+    # miss some trade-offs in exchange for bounded work.
+    if source not in graph.vertices or destination not in graph.vertices:
+        return []
+
+    bounds = [lower_bounds(graph, destination, metric) for metric in METRICS]
+    if source not in bounds[0]:
+        return []
+
+    options = leg_options(graph, [edge_weights(graph, metric) for metric in METRICS])
+    tie_breaker = count()
+    # label: [distance, time, cost, vertex, parent label, alive, flight id]
+    start = [0, 0, 0, source, None, True, None]
+    labels = {source: [start]}
+    priority_queue = [(0, 0, 0, next(tie_breaker), start)]
+    found = []
+
+    while priority_queue:
+        *_, label = heapq.heappop(priority_queue)
+        if not label[5]:
+            continue
+
+        vertex = label[3]
+        if vertex == destination:
+            found.append(label)
+            continue
+
+        for neighbor in graph.vertices[vertex]:
+            if neighbor not in bounds[0]:
+                continue
+
+            for distance, time, cost, edge_id in options(vertex, neighbor):
+                candidate = (label[0] + distance, label[1] + time, label[2] + cost)
+                optimistic = (
+                    candidate[0] + bounds[0][neighbor],
+                    candidate[1] + bounds[1][neighbor],
+                    candidate[2] + bounds[2][neighbor],
+                )
+                if any(dominates(route, optimistic) for route in found):
+                    continue
+
+                bucket = labels.setdefault(neighbor, [])
+                if any(dominates(existing, candidate) for existing in bucket):
+                    continue
+
+                survivors = []
+                for existing in bucket:
+                    if dominates(candidate, existing):
+                        existing[5] = False
+                    else:
+                        survivors.append(existing)
+                if max_labels is not None and len(survivors) >= max_labels:
+                    labels[neighbor] = survivors
+                    continue
+
+                new_label = [candidate[0], candidate[1], candidate[2], neighbor, label, True, edge_id]
+                survivors.append(new_label)
+                labels[neighbor] = survivors
+                heapq.heappush(priority_queue, (*candidate, next(tie_breaker), new_label))
+
+    routes = []
+    for label in found:
+        path, flights = [], []
+        step = label
+        while step is not None:
+            path.append(step[3])
+            flights.append(step[6])
+            step = step[4]
+        path.reverse()
+        flights.reverse()
+        edges = flights[1:] if graph.edges is not None else None
+        routes.append(ParetoRoute(label[0], label[1], label[2], path, edges))
+    return routes
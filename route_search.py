@@ -0,0 +1,159 @@
+import heapq
+import math
+import weakref
+
+INF = float('inf')
+EARTH_RADIUS_KM = 6371.0
+
+_scale_cache = weakref.WeakKeyDictionary()
+
+
+def haversine(first, second):
+    lat1, lon1 = map(math.radians, first)
+    lat2, lon2 = map(math.radians, second)
+    a = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(a))
+
+
+def heuristic_scale(graph):
+    # Route lengths are not guaranteed to exceed the great-circle distance, so
+    # the haversine bound is scaled by the smallest weight/great-circle ratio
+    # over all edges. That keeps the heuristic admissible and consistent. A
+    # graph with any airport missing coordinates gets scale 0, i.e. plain Dijkstra.
+    cached = _scale_cache.get(graph)
+    if cached and cached[0] == graph.version:
+        return cached[1]
+
+    coordinates = graph.coordinates
+    scale = 1.0
+    if any(name not in coordinates for name in graph.vertices):
+        scale = 0.0
+    else:
+        for name, connections in graph.vertices.items():
+            for neighbor, weight in connections.items():
+                great_circle = haversine(coordinates[name], coordinates[neighbor])
+                if great_circle > 0:
+                    scale = min(scale, weight / great_circle)
+        scale = max(scale, 0.0) * (1 - 1e-9)
+
+    _scale_cache[graph] = (graph.version, scale)
+    return scale
+
+
+def distance_bound(graph, target):
+    scale = heuristic_scale(graph)
+    if not scale:
+        return lambda vertex: 0.0
+
+    coordinates = graph.coordinates
+    target_position = coordinates[target]
+    bounds = {}
+
+    def bound(vertex):
+        value = bounds.get(vertex)
+        if value is None:
+            value = bounds[vertex] = scale * haversine(coordinates[vertex], target_position)
+        return value
+
+    return bound
+
+
+def reconstruct_path(previous, source, destination):
+    path = [destination]
+    while path[-1] != source:
+        path.append(previous[path[-1]])
+    path.reverse()
+    return path
+
+
+def astar(graph, source, destination):
+    if source not in graph.vertices or destination not in graph.vertices:
+        return INF, [], 0
+
+    bound = distance_bound(graph, destination)
+    distances = {source: 0}
+    previous = {}
+    settled = set()
+    priority_queue = [(bound(source), 0, source)]
+
+    while priority_queue:
+        _, current_distance, current_vertex = heapq.heappop(priority_queue)
+
+        if current_vertex in settled:
+            continue
+        settled.add(current_vertex)
+
+        if current_vertex == destination:
+            return current_distance, reconstruct_path(previous, source, destination), len(settled)
+
+        for neighbor, weight in graph.vertices[current_vertex].items():
+            distance = current_distance + weight
+
+            if neighbor not in settled and distance < distances.get(neighbor, INF):
+                distances[neighbor] = distance
+                previous[neighbor] = current_vertex
+                heapq.heappush(priority_queue, (distance + bound(neighbor), distance, neighbor))
+
+    return INF, [], len(settled)
+
+
+def bidirectional_dijkstra(graph, source, destination):
+    if source not in graph.vertices or destination not in graph.vertices:
+        return INF, [], 0
+    if source == destination:
+        return 0, [source], 1
+
+    # Both searches run on reduced costs from the averaged potential
+    # (h_destination - h_source) / 2, which stays consistent in each direction.
+    to_destination = distance_bound(graph, destination)
+    to_source = distance_bound(graph, source)
+
+    def potential(vertex):
+        return (to_destination(vertex) - to_source(vertex)) / 2
+
+    adjacency = (graph.vertices, graph.reverse_vertices())
+    signs = (1, -1)
+    distances = ({source: 0}, {destination: 0})
+    previous = ({}, {})
+    settled = (set(), set())
+    queues = ([(potential(source), source)], [(-potential(destination), destination)])
+    best = INF
+    meeting = None
+
+    while queues[0] and queues[1]:
+        if queues[0][0][0] + queues[1][0][0] >= best:
+            break
+
+        side = 0 if queues[0][0][0] <= queues[1][0][0] else 1
+        other = 1 - side
+        _, current_vertex = heapq.heappop(queues[side])
+
+        if current_vertex in settled[side]:
+            continue
+        settled[side].add(current_vertex)
+        current_distance = distances[side][current_vertex]
+
+        for neighbor, weight in adjacency[side][current_vertex].items():
+            distance = current_distance + weight
+
+            if neighbor not in settled[side] and distance < distances[side].get(neighbor, INF):
+                distances[side][neighbor] = distance
+                previous[side][neighbor] = current_vertex
+                heapq.heappush(queues[side], (distance + signs[side] * potential(neighbor), neighbor))
+
+            if neighbor in distances[other] and distance + distances[other][neighbor] < best:
+                best = distance + distances[other][neighbor]
+                meeting = (current_vertex, neighbor) if side == 0 else (neighbor, current_vertex)
+
+    settled_count = len(settled[0]) + len(settled[1])
+    if meeting is None:
+        return INF, [], settled_count
+
+    forward_end, backward_start = meeting
+    path = reconstruct_path(previous[0], source, forward_end)
+    vertex = backward_start
+    path.append(vertex)
+    while vertex != destination:
+        vertex = previous[1][vertex]
+        path.append(vertex)
+    return best, path, settled_count
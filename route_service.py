@@ -0,0 +1,407 @@
+import argparse
+import asyncio
+import json
+import multiprocessing
+import threading
+from itertools import islice
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from urllib.parse import parse_qs, unquote, urlsplit
+
+from flight_core import (
+    FareTable, Graph, Passenger, RouteQuery, TicketBookingSystem, build_flight_map, get_airport_name,
+)
+from inventory import SeatInventory, SeatsUnavailable
+from journal import BookingJournal, DEFAULT_SYNC_EVERY
+
+HTTP_REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed", 409: "Conflict",
+                500: "Internal Server Error"}
+
+
+DEFAULT_ALTERNATIVES = 5
+DEFAULT_MAX_DETOUR = 1.5
+
+
+class ServiceError(ValueError):
+    pass
+
+
+def create_default_graph():
+    graph = Graph()
+    build_flight_map(graph)
+    graph.enable_route_table()
+    graph.enable_route_cache()
+    return graph
+
+
+def airport_name(code, graph=None):
+    name = get_airport_name(str(code).upper(), graph)
+    if not name:
+        raise ServiceError(f"Invalid airport code: {code}")
+    return name
+
+
+def route_to_dict(route):
+    return {
+        "source": route.source,
+        "destination": route.destination,
+        "found": route.found,
+        "distance": route.distance if route.found else None,
+        "time": route.time,
+        "fare": route.fare,
+        "path": route.path,
+        "settled": route.settled,
+        "departure": route.departure,
+        "arrival": route.arrival,
+        "edges": route.edges,
+    }
+
+
+class RouteService:
+    # GUI-independent entry point for route queries and bookings; every method
+    # takes and returns plain JSON-compatible values.
+    def __init__(self, graph=None, booking_system=None, inventory=None):
+        self.graph = graph if graph is not None else create_default_graph()
+        if booking_system is None:
+            booking_system = TicketBookingSystem(total_tickets=200, fare_table=FareTable(self.graph))
+        if booking_system.inventory is None:
+            # Bookings and seat queries share one inventory, so a booked seat is a sold seat.
+            booking_system.attach_inventory(inventory if inventory is not None else SeatInventory())
+        self.booking_system = booking_system
+        self.inventory = booking_system.inventory
+        self.lock = threading.Lock()
+
+    def airports(self):
+        return list(self.graph.vertices)
+
+    def route(self, source, destination, metric="distance", strategy="dijkstra", departure=None):
+        query = RouteQuery(self.graph)
+        source, destination = airport_name(source, self.graph), airport_name(destination, self.graph)
+        if departure is not None:
+            return route_to_dict(query.find_route_at(source, destination, float(departure)))
+        return route_to_dict(query.find_route(source, destination, metric, strategy))
+
+    def pareto(self, source, destination, max_labels=None):
+        routes = RouteQuery(self.graph).pareto(
+            airport_name(source, self.graph), airport_name(destination, self.graph), max_labels)
+        return [
+            {"distance": r.distance, "time": r.time, "fare": r.fare, "path": r.path, "edges": r.edges}
+            for r in routes
+        ]
+
+    def alternatives(self, source, destination, limit=DEFAULT_ALTERNATIVES, max_detour=DEFAULT_MAX_DETOUR,
+                     date=None, seats=1):
+        # Next-best itineraries for rebooking. With a date, routes without
+        # enough seats on every leg are skipped and the next one is pulled.
+        routes = RouteQuery(self.graph).alternatives(
+            airport_name(source, self.graph), airport_name(destination, self.graph), max_detour)
+        if date is not None:
+            routes = ((route, self.inventory.path_availability(route.path, date)) for route in routes)
+            routes = (dict(route_to_dict(route), available=available)
+                      for route, available in routes if available >= seats)
+        else:
+            routes = map(route_to_dict, routes)
+        return list(islice(routes, limit))
+
+    def availability(self):
+        with self.lock:
+            return {"available": self.booking_system.check_ticket_availability(),
+                    "total": self.booking_system.total_tickets}
+
+    def book(self, source, destination, passengers, date=None):
+        # With a date the passengers also take a seat on every leg of the route that day.
+        airport_name(source, self.graph)
+        airport_name(destination, self.graph)
+        if not passengers:
+            raise ServiceError("At least one passenger is required")
+        route = self.route_path(source, destination) if date is not None else None
+
+        records = []
+        for details in passengers:
+            if not isinstance(details, dict) or not details.get("name"):
+                raise ServiceError("Every passenger needs a name")
+            records.append(Passenger(details["name"], details.get("age"), details.get("phone"), source, destination,
+                                     date=date, route=route))
+
+        with self.lock:
+            success, waiting_list = self.booking_system.book_tickets(len(records), records)
+            available = self.booking_system.check_ticket_availability()
+        return {
+            "booked": success,
+            "waiting_list": [passenger.name for passenger in waiting_list],
+            "available": available,
+        }
+
+    def route_path(self, source, destination):
+        route = RouteQuery(self.graph).find_route(
+            airport_name(source, self.graph), airport_name(destination, self.graph))
+        if not route.found:
+            raise ServiceError(f"No path found from {route.source} to {route.destination}.")
+        return route.path
+
+    def seats(self, source, destination, date):
+        path = self.route_path(source, destination)
+        return {"path": path, "date": date, "available": self.inventory.path_availability(path, date)}
+
+    def reserve(self, source, destination, date, seats=1):
+        reservation = self.inventory.reserve_path(self.route_path(source, destination), date, int(seats))
+        return {
+            "reservation_id": reservation.reservation_id,
+            "seats": reservation.seats,
+            "legs": [leg._asdict() for leg in reservation.legs],
+        }
+
+    def cancel_reservation(self, reservation_id):
+        return self.inventory.cancel(int(reservation_id))
+
+    def passenger(self, name):
+        with self.lock:
+            details = self.booking_system.get_passenger_details(name)
+        if not isinstance(details, tuple):
+            return None
+        name, age, phone, ticket_number = details
+        return {"name": name, "age": age, "phone": phone, "ticket_number": ticket_number}
+
+    def bookings(self):
+        with self.lock:
+            return [dict(details, passenger_name=name)
+                    for name, details in self.booking_system.passenger_details.items()]
+
+
+_worker_service = None
+
+
+def _start_worker(vertices, coordinates, edge_metrics, airports, directed=False, edges=None):
+    # Process workers rebuild the route graph once, from the snapshot taken
+    # when the server started.
+    global _worker_service
+    graph = Graph(directed)
+    for name in vertices:
+        graph.add_vertex(name, *coordinates.get(name, (None, None)))
+    for src, connections in vertices.items():
+        for dest, weight in connections.items():
+            time, cost = edge_metrics.get((src, dest), (None, None))
+            graph.add_edge(src, dest, weight, time, cost)
+    graph.airports = airports
+    graph.edges = edges
+    graph.enable_route_table()
+    graph.enable_route_cache()
+    _worker_service = RouteService(graph, TicketBookingSystem(total_tickets=0))
+
+
+def _worker_call(method, args):
+    return getattr(_worker_service, method)(*args)
+
+
+class RouteServer:
+    def __init__(self, service=None, workers=None, processes=False):
+        self.service = service if service is not None else RouteService()
+        self.processes = processes
+        if processes:
+            # Spawned rather than forked workers do not inherit the listening
+            # socket or open client connections.
+            graph = self.service.graph
+            self.executor = ProcessPoolExecutor(
+                max_workers=workers, mp_context=multiprocessing.get_context("spawn"),
+                initializer=_start_worker,
+                initargs=(graph.vertices, graph.coordinates, graph.edge_metrics, graph.airports, graph.directed,
+                          graph.edges))
+        else:
+            self.executor = ThreadPoolExecutor(max_workers=workers)
+        self.server = None
+
+    async def offload(self, method, *args):
+        # Searches run in the worker pool so the event loop keeps serving
+        # other connections; bookings stay in this process with the state.
+        loop = asyncio.get_running_loop()
+        if self.processes:
+            return await loop.run_in_executor(self.executor, _worker_call, method, args)
+        return await loop.run_in_executor(self.executor, getattr(self.service, method), *args)
+
+    async def local(self, method, *args):
+        # Calls that read or change seats and bookings need the state in this
+        # process, but they search routes, wait on locks and fsync the
+        # journal, so they still run on a thread rather than the event loop.
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, getattr(self.service, method), *args)
+
+    async def dispatch(self, method, target, body):
+        url = urlsplit(target)
+        path = url.path.rstrip("/") or "/"
+        query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+
+        if path == "/airports" and method == "GET":
+            return 200, self.service.airports()
+        if path == "/route" and method == "GET":
+            args = (required(query, "source"), required(query, "destination"),
+                    query.get("metric", "distance"), query.get("strategy", "dijkstra"), query.get("departure"))
+            if self.processes and args[4] is not None:
+                # Time profiles and closures change while the server runs;
+                # the workers only have the graph as it was at startup.
+                return 200, await self.local("route", *args)
+            return 200, await self.offload("route", *args)
+        if path == "/pareto" and method == "GET":
+            max_labels = int(query["max_labels"]) if "max_labels" in query else None
+            return 200, await self.offload(
+                "pareto", required(query, "source"), required(query, "destination"), max_labels)
+        if path == "/alternatives" and method == "GET":
+            max_detour = float(query["max_detour"]) if "max_detour" in query else DEFAULT_MAX_DETOUR
+            args = (required(query, "source"), required(query, "destination"),
+                    int(query.get("limit", DEFAULT_ALTERNATIVES)), max_detour, query.get("date"),
+                    int(query.get("seats", 1)))
+            if self.processes and args[4] is not None:
+                # Seat counts live in this process, not in the workers.
+                return 200, await self.local("alternatives", *args)
+            return 200, await self.offload("alternatives", *args)
+        if path == "/availability" and method == "GET":
+            if "source" in query or "destination" in query:
+                return 200, await self.local(
+                    "seats", required(query, "source"), required(query, "destination"), required(query, "date"))
+            return 200, await self.local("availability")
+        if path == "/reservations" and method == "POST":
+            payload = parse_body(body)
+            return 200, await self.local(
+                "reserve", required(payload, "source"), required(payload, "destination"), required(payload, "date"),
+                payload.get("seats", 1))
+        if path.startswith("/reservations/") and method == "DELETE":
+            if not await self.local("cancel_reservation", path[len("/reservations/"):]):
+                return 404, {"error": "Reservation not found"}
+            return 200, {"cancelled": True}
+        if path == "/bookings" and method == "GET":
+            return 200, await self.local("bookings")
+        if path == "/bookings" and method == "POST":
+            payload = parse_body(body)
+            return 200, await self.local(
+                "book", required(payload, "source"), required(payload, "destination"), payload.get("passengers", []),
+                payload.get("date"))
+        if path.startswith("/passengers/") and method == "GET":
+            details = await self.local("passenger", unquote(path[len("/passengers/"):]))
+            if details is None:
+                return 404, {"error": "Passenger not found"}
+            return 200, details
+        if path in ("/airports", "/route", "/alternatives", "/pareto", "/availability", "/bookings", "/reservations"):
+            return 405, {"error": f"{method} not allowed on {path}"}
+        return 404, {"error": f"No such endpoint: {path}"}
+
+    async def handle_connection(self, reader, writer):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line.strip():
+                    break
+
+                try:
+                    method, target, version = request_line.decode("latin-1").split()
+                except ValueError:
+                    await self.respond(writer, 400, {"error": "Malformed request line"}, False)
+                    break
+
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    key, _, value = line.decode("latin-1").partition(":")
+                    headers[key.strip().lower()] = value.strip()
+
+                try:
+                    length = int(headers.get("content-length", 0) or 0)
+                    if length < 0:
+                        raise ValueError(length)
+                except ValueError:
+                    # Without a usable length the body cannot be skipped, so the connection ends here.
+                    await self.respond(writer, 400, {"error": "Malformed Content-Length"}, False)
+                    break
+                body = await reader.readexactly(length) if length else b""
+                keep_alive = headers.get("connection", "").lower() != "close" and version == "HTTP/1.1"
+
+                try:
+                    status, payload = await self.dispatch(method.upper(), target, body)
+                except SeatsUnavailable as error:
+                    status, payload = 409, {"error": str(error)}
+                except ValueError as error:
+                    status, payload = 400, {"error": str(error)}
+                except Exception as error:
+                    status, payload = 500, {"error": f"{type(error).__name__}: {error}"}
+
+                await self.respond(writer, status, payload, keep_alive)
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionResetError):
+            pass
+        finally:
+            writer.close()
+
+    async def respond(self, writer, status, payload, keep_alive):
+        data = json.dumps(payload).encode("utf-8")
+        head = (
+            f"HTTP/1.1 {status} {HTTP_REASONS.get(status, '')}\r\n"
+            f"Content-Type: application/json\r\n"
+            f"Content-Length: {len(data)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+        )
+        writer.write(head.encode("latin-1") + data)
+        await writer.drain()
+
+    async def start(self, host="127.0.0.1", port=8080):
+        self.server = await asyncio.start_server(self.handle_connection, host, port)
+        return self.server
+
+    async def serve_forever(self, host="127.0.0.1", port=8080):
+        server = await self.start(host, port)
+        async with server:
+            await server.serve_forever()
+
+    def close(self):
+        if self.server:
+            self.server.close()
+        self.executor.shutdown(wait=False)
+        with self.service.lock:
+            self.service.booking_system.close()
+
+
+def required(values, key):
+    value = values.get(key)
+    if value in (None, ""):
+        raise ServiceError(f"Missing parameter: {key}")
+    return value
+
+
+def parse_body(body):
+    try:
+        payload = json.loads(body or b"{}")
+    except json.JSONDecodeError as error:
+        raise ServiceError(f"Invalid JSON body: {error}") from error
+    if not isinstance(payload, dict):
+        raise ServiceError("JSON body must be an object")
+    return payload
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve AeroPathfinder routes and bookings as JSON over HTTP.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--processes", action="store_true", help="run searches in worker processes instead of threads")
+    parser.add_argument("--journal", help="keep bookings in this journal file so they survive restarts")
+    parser.add_argument("--sync-every", type=int, default=DEFAULT_SYNC_EVERY, help="fsync the journal after this many bookings")
+    args = parser.parse_args()
+
+    service = None
+    if args.journal:
+        graph = create_default_graph()
+        journal = BookingJournal(args.journal, sync_every=args.sync_every)
+        # The inventory is attached before the journal is replayed, so recovered tickets keep their seats.
+        service = RouteService(graph, TicketBookingSystem(total_tickets=200, journal=journal,
+                                                          fare_table=FareTable(graph), inventory=SeatInventory()))
+    server = RouteServer(service, workers=args.workers, processes=args.processes)
+    print(f"Serving on http://{args.host}:{args.port}")
+    try:
+        asyncio.run(server.serve_forever(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.close()
+
+
+if __name__ == "__main__":
+    main()
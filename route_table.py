@@ -0,0 +1,135 @@
+from array import array
+import heapq
+
+ROUTE_TABLE_MAX_VERTICES = 2000
+
+INF = float('inf')
+
+
+def estimate_memory(vertex_count):
+    # One 8-byte distance and one 4-byte next hop per (source, destination) pair,
+    # plus the fixed header of the two arrays that make up every row.
+    row_overhead = 2 * array('d').__sizeof__()
+    return vertex_count * (vertex_count * (8 + 4) + row_overhead)
+
+
+class RouteTable:
+    def __init__(self, graph):
+        self.graph = graph
+        self.names = []
+        self.index = {}
+        self.distances = []
+        self.next_hops = []
+        self.rebuild()
+
+    def rebuild(self):
+        self.names = list(self.graph.vertices)
+        self.index = {name: i for i, name in enumerate(self.names)}
+        self.distances = []
+        self.next_hops = []
+        for source_id in range(len(self.names)):
+            distances, next_hops = self._search(source_id)
+            self.distances.append(distances)
+            self.next_hops.append(next_hops)
+
+    def _search(self, source_id):
+        count = len(self.names)
+        distances = array('d', [INF]) * count
+        next_hops = array('i', [-1]) * count
+        distances[source_id] = 0
+        next_hops[source_id] = source_id
+        priority_queue = [(0, source_id)]
+
+        while priority_queue:
+            current_distance, current_id = heapq.heappop(priority_queue)
+
+            if current_distance > distances[current_id]:
+                continue
+
+            for neighbor, weight in self.graph.vertices[self.names[current_id]].items():
+                neighbor_id = self.index[neighbor]
+                distance = current_distance + weight
+
+                if distance < distances[neighbor_id]:
+                    distances[neighbor_id] = distance
+                    if current_id == source_id:
+                        next_hops[neighbor_id] = neighbor_id
+                    else:
+                        next_hops[neighbor_id] = next_hops[current_id]
+                    heapq.heappush(priority_queue, (distance, neighbor_id))
+
+        return distances, next_hops
+
+    def _refresh_rows(self, source_ids):
+        for source_id in source_ids:
+            self.distances[source_id], self.next_hops[source_id] = self._search(source_id)
+
+    def add_vertex(self, name):
+        if name in self.index:
+            # Re-adding a vertex clears its connections, which can affect any row.
+            self.rebuild()
+            return
+
+        new_id = len(self.names)
+        self.names.append(name)
+        self.index[name] = new_id
+        for distances, next_hops in zip(self.distances, self.next_hops):
+            distances.append(INF)
+            next_hops.append(-1)
+
+        distances = array('d', [INF]) * (new_id + 1)
+        next_hops = array('i', [-1]) * (new_id + 1)
+        distances[new_id] = 0
+        next_hops[new_id] = new_id
+        self.distances.append(distances)
+        self.next_hops.append(next_hops)
+
+    def edge_changed(self, src, dest, old_weight, new_weight):
+        if old_weight == new_weight:
+            return []
+
+        src_id = self.index[src]
+        dest_id = self.index[dest]
+        affected = []
+
+        for source_id, distances in enumerate(self.distances):
+            to_src = distances[src_id]
+            to_dest = distances[dest_id]
+
+            if to_src == INF and to_dest == INF:
+                stale = False
+            elif old_weight is None or new_weight < old_weight:
+                # A new or cheaper connection only matters to rows it now shortcuts.
+                stale = to_src + new_weight < to_dest or to_dest + new_weight < to_src
+            else:
+                # A dearer connection only matters to rows whose shortest paths use it.
+                stale = to_dest == to_src + old_weight or to_src == to_dest + old_weight
+
+            if stale:
+                affected.append(source_id)
+
+        self._refresh_rows(affected)
+        return affected
+
+    def distance(self, source, destination):
+        return self.distances[self.index[source]][self.index[destination]]
+
+    def path(self, source, destination):
+        source_id = self.index[source]
+        destination_id = self.index[destination]
+
+        if self.next_hops[source_id][destination_id] == -1:
+            return []
+
+        path = [source]
+        current_id = source_id
+        while current_id != destination_id:
+            current_id = self.next_hops[current_id][destination_id]
+            path.append(self.names[current_id])
+        return path
+
+    def lookup(self, source, destination):
+        return self.distance(source, destination), self.path(source, destination)
+
+    def memory_usage(self):
+        return estimate_memory(len(self.names))
@@ -0,0 +1,98 @@
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+POLL_MS = 50
+DEFAULT_WORKERS = 2
+
+
+class TaskCancelled(Exception):
+    pass
+
+
+class Task:
+    def __init__(self, runner, on_done, on_error, on_progress):
+        self.runner = runner
+        self.on_done = on_done
+        self.on_error = on_error
+        self.on_progress = on_progress
+        self.cancel_event = threading.Event()
+        self.future = None
+
+    @property
+    def cancelled(self):
+        return self.cancel_event.is_set()
+
+    def cancel(self):
+        # Work that has not started is dropped; running work stops at its
+        # next check() or progress(), and its result is never delivered.
+        # Only the first call queues the finished marker for dropped work.
+        if self.cancel_event.is_set():
+            return
+        self.cancel_event.set()
+        if self.future is not None and self.future.cancel():
+            self.runner.results.put((self, None, (), True))
+
+    def check(self):
+        if self.cancel_event.is_set():
+            raise TaskCancelled()
+
+    def progress(self, fraction, message=""):
+        self.check()
+        if self.on_progress is not None:
+            self.runner.results.put((self, self.on_progress, (fraction, message), False))
+
+
+class TaskRunner:
+    # Runs slow work such as route searches and map layout on worker threads.
+    # Workers never touch Tk widgets: results and progress are queued and
+    # handed to the callbacks on the Tk thread by an after() poll, which only
+    # runs while tasks are outstanding.
+    def __init__(self, widget, workers=DEFAULT_WORKERS):
+        self.widget = widget
+        self.executor = ThreadPoolExecutor(max_workers=workers)
+        self.results = queue.Queue()
+        self.pending = 0
+        self.polling = None
+
+    def submit(self, function, *args, on_done=None, on_error=None, on_progress=None):
+        # function is called as function(task, *args) on a worker thread.
+        task = Task(self, on_done, on_error if on_error is not None else self.report_error, on_progress)
+        self.pending += 1
+        task.future = self.executor.submit(self.run, task, function, args)
+        if self.polling is None:
+            self.polling = self.widget.after(POLL_MS, self.poll)
+        return task
+
+    def run(self, task, function, args):
+        try:
+            result = function(task, *args)
+        except TaskCancelled:
+            self.results.put((task, None, (), True))
+        except Exception as error:
+            self.results.put((task, task.on_error, (error,), True))
+        else:
+            self.results.put((task, task.on_done, (result,), True))
+
+    def poll(self):
+        self.polling = None
+        while True:
+            try:
+                task, callback, args, finished = self.results.get_nowait()
+            except queue.Empty:
+                break
+            if finished:
+                self.pending -= 1
+            if callback is not None and not task.cancelled:
+                callback(*args)
+        if self.pending:
+            self.polling = self.widget.after(POLL_MS, self.poll)
+
+    def report_error(self, error):
+        self.widget.report_callback_exception(type(error), error, error.__traceback__)
+
+    def shutdown(self):
+        if self.polling is not None:
+            self.widget.after_cancel(self.polling)
+            self.polling = None
+        self.executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,72 @@
+import os
+import random
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flight_core import Graph, build_flight_map  # noqa: E402
+
+
+@pytest.fixture
+def random_graph():
+    # build(seed) -> a connected graph of named airports with integer
+    # distances and random extra routes; directed graphs get one-way routes.
+    def build(seed, count=30, extra=45, directed=False, metrics=False, coordinates=False):
+        rng = random.Random(seed)
+        graph = Graph(directed)
+        for i in range(count):
+            if coordinates:
+                graph.add_vertex(f"A{i}", rng.uniform(24, 37), rng.uniform(61, 77))
+            else:
+                graph.add_vertex(f"A{i}")
+
+        def leg(src, dest):
+            weight = rng.randint(50, 900)
+            if metrics:
+                graph.add_edge(src, dest, weight, rng.randint(30, 200), rng.randint(1000, 9000))
+            else:
+                graph.add_edge(src, dest, weight)
+
+        for i in range(1, count):
+            leg(f"A{i}", f"A{rng.randrange(i)}")
+            if directed:
+                leg(f"A{rng.randrange(i)}", f"A{i}")
+        for _ in range(extra):
+            i, j = rng.sample(range(count), 2)
+            leg(f"A{i}", f"A{j}")
+        return graph
+
+    return build
+
+
+@pytest.fixture
+def network():
+    graph = Graph()
+    build_flight_map(graph)
+    return graph
+
+
+@pytest.fixture
+def path_length():
+    # Distance flown along a path, checking every leg exists.
+    def length(graph, path):
+        return sum(graph.vertices[src][dest] for src, dest in zip(path, path[1:]))
+
+    return length
+
+
+@pytest.fixture
+def simple_paths():
+    # Every loopless path from source to destination, by brute force.
+    def paths(graph, source, destination, path=None):
+        path = path or [source]
+        if path[-1] == destination:
+            yield path
+            return
+        for neighbor in graph.vertices[path[-1]]:
+            if neighbor not in path:
+                yield from paths(graph, source, destination, path + [neighbor])
+
+    return paths
@@ -0,0 +1,83 @@
+import random
+
+import pytest
+
+from airport_data import AirportIndex, load_compact, load_network, save_binary, save_json
+from flight_core import Graph, dijkstra
+
+
+def network_state(graph):
+    return graph.vertices, graph.coordinates, graph.edge_metrics, graph.airports.names
+
+
+def flight_state(graph):
+    return graph.directed, graph.reverse, graph.edges.flights(), graph.edges.by_pair
+
+
+def with_codes(graph):
+    graph.airports = AirportIndex((f"C{i:02}", name) for i, name in enumerate(graph.vertices))
+    return graph
+
+
+@pytest.mark.parametrize("extension", [".json", ".bin"])
+def test_bundled_network_round_trips(tmp_path, network, extension):
+    path = str(tmp_path / f"network{extension}")
+    (save_json if extension == ".json" else save_binary)(network, path)
+    loaded = load_network(Graph(), path)
+    assert network_state(loaded) == network_state(network)
+
+
+@pytest.mark.parametrize("seed", range(4))
+def test_random_network_round_trips_through_every_format(tmp_path, random_graph, seed):
+    graph = with_codes(random_graph(seed, metrics=True, coordinates=True))
+    # One leg on the flat per-leg time and fare, one airport with no position.
+    graph.add_edge("A3", "A17", 444)
+    graph.coordinates.pop("A5")
+
+    save_json(graph, str(tmp_path / "network.json"))
+    from_json = load_network(Graph(), str(tmp_path / "network.json"))
+    save_binary(from_json, str(tmp_path / "network.bin"))
+    from_binary = load_network(Graph(), str(tmp_path / "network.bin"))
+    assert network_state(from_json) == network_state(graph)
+    assert network_state(from_binary) == network_state(graph)
+
+    compact = load_compact(str(tmp_path / "network.bin"))
+    for source in ("A0", "A11", "A29"):
+        expected = dijkstra(graph, source)
+        assert dijkstra(from_binary, source) == expected
+        distances = compact.dijkstra(compact.ids[source])[0]
+        assert {name: distances[i] for i, name in enumerate(compact.names)} == expected
+
+
+def directed_multigraph(seed=3, count=12):
+    # Several carriers per direction, one-way pairs and a removed flight.
+    rng = random.Random(seed)
+    graph = Graph(directed=True)
+    for i in range(count):
+        graph.add_vertex(f"A{i}", rng.uniform(24, 37), rng.uniform(61, 77))
+    flights = []
+    for _ in range(count * 4):
+        i, j = rng.sample(range(count), 2)
+        flights.append(graph.add_flight(f"A{i}", f"A{j}", rng.randint(100, 900), rng.choice(["PK", "PA", None]),
+                                        rng.randint(40, 180), rng.randint(2000, 9000)))
+    graph.remove_flight(flights[5])
+    return with_codes(graph)
+
+
+@pytest.mark.parametrize("extension", [".json", ".bin"])
+def test_directed_multigraph_round_trips(tmp_path, network, extension):
+    graph = directed_multigraph()
+    assert any(src not in graph.vertices[dest] for src, dest in graph.edges.by_pair)
+    path = str(tmp_path / f"network{extension}")
+    (save_json if extension == ".json" else save_binary)(graph, path)
+
+    loaded = load_network(Graph(), path)
+    assert network_state(loaded) == network_state(graph)
+    assert flight_state(loaded) == flight_state(graph)
+    for source in graph.vertices:
+        assert dijkstra(loaded, source) == dijkstra(graph, source)
+    # New flights carry on from the saved ids.
+    assert loaded.add_flight("A0", "A1", 500) == graph.add_flight("A0", "A1", 500)
+
+    with pytest.raises(ValueError):
+        load_network(network, path)
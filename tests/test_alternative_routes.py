@@ -0,0 +1,50 @@
+import random
+
+import pytest
+
+from alternative_routes import k_shortest_paths
+from flight_core import RouteQuery
+from pareto import edge_weights
+
+
+def brute_force(graph, simple_paths, source, destination, metric):
+    weight_of = edge_weights(graph, metric)
+    return sorted((sum(weight_of(src, dest) for src, dest in zip(path, path[1:])), path)
+                  for path in simple_paths(graph, source, destination))
+
+
+@pytest.mark.parametrize("seed", range(6))
+@pytest.mark.parametrize("directed", [False, True])
+@pytest.mark.parametrize("metric", ["distance", "time", "cost"])
+def test_every_loopless_route_in_order(random_graph, simple_paths, seed, directed, metric):
+    graph = random_graph(seed, count=8, extra=8, directed=directed, metrics=True)
+    rng = random.Random(seed)
+    for _ in range(4):
+        source, destination = rng.sample(sorted(graph.vertices), 2)
+        routes = list(k_shortest_paths(graph, source, destination, metric=metric))
+        costs = [cost for cost, _ in routes]
+        assert costs == sorted(costs)
+        assert sorted(routes) == brute_force(graph, simple_paths, source, destination, metric)
+
+
+@pytest.mark.parametrize("seed", range(4))
+def test_max_detour_stops_at_the_limit(random_graph, simple_paths, seed):
+    graph = random_graph(seed, count=9, extra=10)
+    expected = brute_force(graph, simple_paths, "A0", "A8", "distance")
+    limit = expected[0][0] * 1.3
+    routes = list(k_shortest_paths(graph, "A0", "A8", max_detour=1.3))
+    assert sorted(routes) == [(cost, path) for cost, path in expected if cost <= limit]
+
+
+def test_unknown_or_unreachable_airports_give_nothing(random_graph):
+    graph = random_graph(2, count=6)
+    graph.add_vertex("Island")
+    assert list(k_shortest_paths(graph, "A0", "Island")) == []
+    assert list(k_shortest_paths(graph, "A0", "Nowhere")) == []
+
+
+def test_alternatives_are_priced_per_route(network):
+    routes = list(RouteQuery(network).alternatives("Lahore", "Karachi", max_detour=1.2))
+    assert routes and routes[0].distance == RouteQuery(network).find_route("Lahore", "Karachi").distance
+    for route in routes:
+        assert network.route_totals(route.path) == (route.distance, route.time, route.fare)
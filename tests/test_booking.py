@@ -0,0 +1,97 @@
+import json
+
+import pytest
+
+from flight_core import Passenger, TicketBookingSystem
+from inventory import SeatInventory, SeatsUnavailable
+from journal import BookingJournal, encode_record
+from route_service import RouteService
+
+
+def state(system):
+    return json.loads(json.dumps(system.snapshot_state(), default=encode_record))
+
+
+def passenger(name):
+    return Passenger(name, 30, "03001234567", "KHI", "LHE")
+
+
+def test_ticketed_passenger_is_not_waitlisted(tmp_path):
+    path = str(tmp_path / "bookings.journal")
+    system = TicketBookingSystem(2, BookingJournal(path, snapshot_every=3))
+    system.book_tickets(1, [passenger("p1")])
+    system.book_tickets(2, [passenger("p2"), passenger("p3")])
+    system.add_passenger(passenger("p4"))
+
+    assert system.add_to_waitlist(["p1", "p4", "p4", "nobody"]) == (False, ["p1", "p4", "nobody"])
+    system.cancel_booking("p2")
+    system.cancel_booking("p3")
+    tickets = sorted(details["ticket_number"] for details in system.passenger_details.values())
+    assert tickets == ["Ticket 1", "Ticket 4"]
+    expected = state(system)
+    system.close()
+
+    recovered = TicketBookingSystem(99, BookingJournal(path))
+    assert state(recovered) == expected
+    recovered.close()
+
+
+def test_booking_takes_seats_on_every_leg(tmp_path):
+    path = str(tmp_path / "bookings.journal")
+    date = "2026-11-01"
+    service = RouteService(booking_system=TicketBookingSystem(
+        10, BookingJournal(path), inventory=SeatInventory(seats_per_leg=3)))
+    assert service.seats("KHI", "PEW", date)["available"] == 3
+
+    service.book("KHI", "PEW", [{"name": "p1"}, {"name": "p2"}], date)
+    assert service.seats("KHI", "PEW", date)["available"] == 1
+    # The legs are shared with a shorter route on the same day.
+    assert service.seats("KHI", "ISB", date)["available"] == 1
+    with pytest.raises(SeatsUnavailable):
+        service.book("KHI", "ISB", [{"name": "p3"}, {"name": "p4"}], date)
+    assert service.seats("KHI", "PEW", date)["available"] == 1
+    assert "p3" not in service.booking_system.passenger_details
+
+    service.booking_system.cancel_booking("p1")
+    assert service.seats("KHI", "PEW", date)["available"] == 2
+    service.booking_system.close()
+
+    recovered = TicketBookingSystem(10, BookingJournal(path), inventory=SeatInventory(seats_per_leg=3))
+    assert RouteService(booking_system=recovered).seats("KHI", "PEW", date)["available"] == 2
+    recovered.close()
+
+
+def test_waitlist_promotion_skips_sold_out_legs():
+    system = TicketBookingSystem(2, inventory=SeatInventory(seats_per_leg=1))
+
+    def dated(name, date):
+        return Passenger(name, 30, "0300", "KHI", "LHE", date=date, route=["Karachi", "Lahore"])
+
+    system.book_tickets(2, [dated("p1", "d1"), dated("p2", "d2")])
+    system.book_tickets(2, [dated("p3", "d1"), dated("p4", "d2")])
+    system.cancel_booking("p2")
+    # p3 is first in line, but only the d2 seat came free.
+    assert "p4" in system.passenger_details
+    assert [passenger.name for passenger in system.waitlist.waiting(system.WAITLIST_FLIGHT)] == ["p3"]
+    system.cancel_booking("p1")
+    assert "p3" in system.passenger_details
+
+
+def test_cancelling_a_waiting_passenger_leaves_the_queue(tmp_path):
+    path = str(tmp_path / "bookings.journal")
+    system = TicketBookingSystem(1, BookingJournal(path, snapshot_every=4))
+    system.book_tickets(3, [passenger("p1"), passenger("p2"), passenger("p3")])
+    assert [waiting.name for waiting in system.waitlist.waiting(None)] == ["p2", "p3"]
+
+    assert system.cancel_booking("p2") == (True, [])
+    assert system.cancel_booking("p2") == (False, [])
+    assert [waiting.name for waiting in system.waitlist.waiting(None)] == ["p3"]
+    _, promoted = system.cancel_booking("p1")
+    assert [waiting.name for waiting in promoted] == ["p3"]
+    assert system.waitlist.size(None) == 0
+    expected = state(system)
+    system.close()
+
+    recovered = TicketBookingSystem(99, BookingJournal(path))
+    assert state(recovered) == expected
+    recovered.close()
@@ -0,0 +1,53 @@
+import random
+
+import pytest
+
+from booking_history import BookingHistory, LiveCounts
+from flight_core import Passenger
+
+AIRPORTS = ["KHI", "LHE", "ISB", "PEW"]
+
+
+@pytest.mark.parametrize("seed", range(4))
+def test_pages_match_a_filtered_list(seed):
+    rng = random.Random(seed)
+    history = BookingHistory()
+    live = []
+    for i in range(600):
+        passenger = Passenger(rng.choice(["Ali", "Alia", "Sara", "Omar"]) + str(i % 7), 30, "0300",
+                              rng.choice(AIRPORTS), rng.choice(AIRPORTS), ticket_number=f"Ticket {i}")
+        history.add(passenger)
+        live.append(passenger)
+        if live and rng.random() < 0.35:
+            cancelled = live.pop(rng.randrange(len(live)))
+            assert history.remove(cancelled.ticket_number)
+            assert not history.remove(cancelled.ticket_number)
+
+        if i % 25 == 0:
+            for page_size in (1, 7, 50):
+                page = rng.randint(0, len(live) // page_size + 1)
+                assert history.page(page, page_size) == (live[page * page_size:(page + 1) * page_size], len(live))
+            filters = {"name": rng.choice(["al", "Sara", "o"]), "source": rng.choice(AIRPORTS + [None])}
+            matches = [p for p in live if p.name.lower().startswith(filters["name"].lower())
+                       and (filters["source"] is None or p.source_airport == filters["source"])]
+            assert history.page(0, 1000, **filters) == (matches, len(matches))
+            if live:
+                ticket = rng.choice(live).ticket_number
+                assert history.page(ticket=ticket.split()[1])[0][0].ticket_number == ticket
+
+
+def test_live_counts_find_every_live_position():
+    rng = random.Random(1)
+    counts = LiveCounts()
+    alive = []
+    for _ in range(300):
+        counts.append(1)
+        alive.append(True)
+        if rng.random() < 0.5:
+            position = rng.randrange(len(alive))
+            if alive[position]:
+                alive[position] = False
+                counts.add(position, -1)
+        positions = [i for i, flag in enumerate(alive) if flag]
+        assert [counts.find(k) for k in range(len(positions))] == positions
+        assert counts.find(len(positions)) is None
@@ -0,0 +1,99 @@
+import random
+import sys
+
+import pytest
+
+from compact_graph import batch_shortest_paths
+from flight_core import Graph, RouteQuery
+
+
+def priced_graph(seed=7, count=40):
+    rng = random.Random(seed)
+    graph = Graph()
+    for i in range(count):
+        graph.add_vertex(f"A{i}")
+    for i in range(1, count):
+        graph.add_edge(f"A{i}", f"A{rng.randrange(i)}", rng.uniform(100, 900),
+                       rng.randint(40, 180), rng.randint(2000, 9000))
+    for _ in range(count * 2):
+        i, j = rng.sample(range(count), 2)
+        # Some legs keep the default time and cost.
+        if rng.random() < 0.2:
+            graph.add_edge(f"A{i}", f"A{j}", rng.uniform(100, 900))
+        else:
+            graph.add_edge(f"A{i}", f"A{j}", rng.uniform(100, 900),
+                           rng.randint(40, 180), rng.randint(2000, 9000))
+    return graph
+
+
+def test_batch_fares_and_times_match_route_query():
+    pytest.importorskip("numpy")
+    graph = priced_graph()
+    batch = batch_shortest_paths(graph, return_predecessors=True)
+    fares, times = batch.fares(), batch.times()
+    query = RouteQuery(graph)
+    for source in graph.vertices:
+        row = batch.row_of[batch.ids[source]]
+        for destination in graph.vertices:
+            route = query.find_route(source, destination)
+            column = batch.ids[destination]
+            assert fares[row, column] == route.fare
+            assert times[row, column] == route.time
+
+
+@pytest.mark.parametrize("directed", [False, True])
+def test_csr_dijkstra_matches_graph_shortest_path(random_graph, path_length, directed):
+    graph = random_graph(11, count=40, directed=directed)
+    compact = graph.compact()
+    for source in graph.vertices:
+        source_id = compact.id_of(source)
+        distances, _ = compact.dijkstra(source_id)
+        for destination in graph.vertices:
+            expected = graph.shortest_path(source, destination)
+            assert distances[compact.id_of(destination)] == expected.distance
+            distance, path = compact.shortest_path(source, destination)
+            assert distance == expected.distance
+            if expected.found:
+                assert path[0] == source and path[-1] == destination
+                assert path_length(graph, path) == distance
+            else:
+                assert path == []
+
+
+def test_compact_graph_is_frozen_and_rebuilt_after_changes(random_graph):
+    graph = random_graph(12, count=10)
+    compact = graph.compact()
+    assert graph.compact() is compact
+    with pytest.raises(AttributeError):
+        compact.weights = None
+    graph.add_edge("A0", "A1", 1)
+    assert graph.compact() is not compact
+    assert graph.compact().shortest_path("A0", "A1") == (1, ["A0", "A1"])
+
+
+@pytest.mark.parametrize("use_scipy", [True, False])
+def test_batch_matches_graph_shortest_path(random_graph, path_length, monkeypatch, use_scipy):
+    pytest.importorskip("numpy")
+    if use_scipy:
+        pytest.importorskip("scipy")
+    else:
+        # Forces the per-source fallback.
+        monkeypatch.setitem(sys.modules, "scipy", None)
+    graph = random_graph(13, count=35, directed=True)
+    graph.add_vertex("LONE")
+    sources = ["A0", "A7", "A20", "LONE"]
+    batch = batch_shortest_paths(graph, sources, return_predecessors=True)
+    hops = batch.hop_counts()
+    for source in sources:
+        row = batch.row_of[batch.ids[source]]
+        for destination in graph.vertices:
+            expected = graph.shortest_path(source, destination)
+            assert batch.distance(source, destination) == expected.distance
+            column = batch.ids[destination]
+            if expected.found:
+                path = batch.path(source, destination)
+                assert path_length(graph, path) == expected.distance
+                assert hops[row, column] == len(path) - 1
+            else:
+                assert batch.path(source, destination) == []
+                assert hops[row, column] == -1
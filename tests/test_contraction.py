@@ -0,0 +1,61 @@
+import random
+
+import pytest
+
+from contraction import ContractionHierarchy, build_hierarchy, hierarchy_search
+from flight_core import Graph, RouteQuery
+
+
+def random_network(rng, float_weights):
+    # Sparse and possibly disconnected, with parallel edges overwritten.
+    vertex_count = rng.randint(2, 300)
+    graph = Graph()
+    for i in range(vertex_count):
+        graph.add_vertex(f"A{i}")
+    for _ in range(rng.randint(vertex_count // 2, vertex_count * 3)):
+        u, v = rng.sample(range(vertex_count), 2)
+        graph.add_edge(f"A{u}", f"A{v}", rng.uniform(1, 1000) if float_weights else rng.randint(1, 1000))
+    return graph
+
+
+def assert_matches_graph(graph, hierarchy, path_length, rng, trials=200):
+    names = list(graph.vertices)
+    for _ in range(trials):
+        source, destination = rng.choice(names), rng.choice(names)
+        expected = graph.shortest_path(source, destination).distance
+        distance, path = hierarchy.query(source, destination)
+        assert distance == expected
+        if expected == float('inf'):
+            assert path == []
+        else:
+            assert path[0] == source and path[-1] == destination
+            assert path_length(graph, path) == expected
+
+
+@pytest.mark.parametrize("seed", range(8))
+def test_hierarchy_matches_dijkstra_after_save_and_load(tmp_path, path_length, seed):
+    rng = random.Random(seed)
+    graph = random_network(rng, float_weights=seed % 2 == 1)
+    hierarchy = build_hierarchy(graph)
+    assert_matches_graph(graph, hierarchy, path_length, rng)
+
+    path = str(tmp_path / "hierarchy.json")
+    hierarchy.save(path)
+    assert_matches_graph(graph, ContractionHierarchy.load(path), path_length, rng)
+
+
+def test_stale_hierarchy_falls_back_to_a_plain_search(network):
+    network.use_contraction_hierarchy()
+    query = RouteQuery(network)
+    before = query.find_route("Karachi", "Islamabad", strategy="contraction")
+    assert before.distance == network.shortest_path("Karachi", "Islamabad").distance
+
+    # A direct route the hierarchy does not know about.
+    network.add_edge("Karachi", "Islamabad", 10)
+    assert hierarchy_search(network, "Karachi", "Islamabad")[:2] == (10, ["Karachi", "Islamabad"])
+    assert query.find_route("Karachi", "Islamabad", strategy="contraction").path == ["Karachi", "Islamabad"]
+
+
+def test_directed_graphs_are_refused(random_graph):
+    with pytest.raises(ValueError):
+        build_hierarchy(random_graph(1, count=5, directed=True))
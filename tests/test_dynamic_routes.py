@@ -0,0 +1,87 @@
+import random
+
+import pytest
+
+from dynamic_routes import INF
+from flight_core import Graph, dijkstra
+
+
+def check_trees(graph, path_length):
+    for source, tree in graph.dynamic_routes.trees.items():
+        expected = {name: distance for name, distance in dijkstra(graph, source).items() if distance != INF}
+        assert tree.distances == expected
+        assert set(tree.parents) == set(expected)
+        for vertex, parent in tree.parents.items():
+            if parent is not None:
+                assert vertex in tree.children[parent]
+            assert path_length(graph, tree.path(vertex)) == expected[vertex]
+
+
+def random_change(graph, rng):
+    src, dest = rng.sample(sorted(graph.vertices), 2)
+    if dest not in graph.vertices[src]:
+        return graph.add_edge(src, dest, rng.randint(50, 900))
+    action = rng.random()
+    if action < 0.3:
+        return graph.remove_edge(src, dest)
+    # Dearer, cheaper or unchanged.
+    weight = graph.vertices[src][dest]
+    return graph.update_edge(src, dest, rng.choice([weight * 3, max(1, weight // 3), weight]))
+
+
+@pytest.mark.parametrize("seed", range(5))
+@pytest.mark.parametrize("directed", [False, True])
+def test_repaired_trees_match_dijkstra(random_graph, path_length, seed, directed):
+    graph = random_graph(seed, count=25, extra=30, directed=directed)
+    routes = graph.enable_dynamic_routes()
+    rng = random.Random(seed)
+    names = sorted(graph.vertices)
+    for _ in range(60):
+        for _ in range(3):
+            routes.lookup(rng.choice(names), rng.choice(names))
+        answers = {(tree.source, destination): answer
+                   for tree in routes.trees.values() for destination, answer in tree.answers.items()}
+
+        changed = random_change(graph, rng)
+        check_trees(graph, path_length)
+        # Exactly the remembered answers that now read differently are reported.
+        expected = [pair for pair, answer in answers.items() if routes.lookup(*pair) != answer]
+        assert sorted(changed) == sorted(expected)
+        assert len(changed) == len(set(changed))
+
+
+def test_unreachable_destinations_come_back(random_graph, path_length):
+    graph = random_graph(3, count=10, extra=0, directed=True)
+    routes = graph.enable_dynamic_routes()
+    source = "A0"
+    # Cut every way into the last airport, then restore one.
+    incoming = [src for src in graph.vertices if "A9" in graph.vertices[src]]
+    routes.lookup(source, "A9")
+    weights = {src: graph.vertices[src]["A9"] for src in incoming}
+    for src in incoming:
+        graph.remove_edge(src, "A9")
+    assert routes.lookup(source, "A9") == (INF, [])
+    changed = graph.add_edge(incoming[0], "A9", weights[incoming[0]])
+    assert changed == [(source, "A9")]
+    check_trees(graph, path_length)
+
+
+def test_a_new_path_of_the_same_length_is_reported():
+    graph = Graph()
+    for name in "ABCD":
+        graph.add_vertex(name)
+    for src, dest in ("AB", "BD", "AC", "CD"):
+        graph.add_edge(src, dest, 100)
+    routes = graph.enable_dynamic_routes()
+    distance, path = routes.lookup("A", "D")
+    assert distance == 200
+    assert graph.remove_edge(path[1], "D") == [("A", "D")]
+    assert routes.lookup("A", "D") == (200, ["A", "C" if path[1] == "B" else "B", "D"])
+
+
+def test_max_sources_evicts_the_oldest_tree(random_graph):
+    graph = random_graph(5, count=12)
+    routes = graph.enable_dynamic_routes(max_sources=3)
+    for source in ("A0", "A1", "A2", "A3"):
+        routes.lookup(source, "A11")
+    assert list(routes.trees) == ["A1", "A2", "A3"]
@@ -0,0 +1,34 @@
+import pytest
+
+from compact_graph import batch_shortest_paths
+from flight_core import Graph, RouteQuery
+
+np = pytest.importorskip("numpy")
+
+
+def two_carrier_graph():
+    graph = Graph()
+    for name in ("Karachi", "Lahore", "Islamabad"):
+        graph.add_vertex(name)
+    slow_cheap = graph.add_flight("Karachi", "Lahore", 100, "PK", 200, 9000)
+    fast_dear = graph.add_flight("Karachi", "Lahore", 500, "PA", 50, 100)
+    onward = graph.add_flight("Lahore", "Islamabad", 300, "PK", 60, 4000)
+    return graph, slow_cheap, fast_dear, onward
+
+
+def test_pareto_legs_come_from_one_flight():
+    graph, slow_cheap, fast_dear, onward = two_carrier_graph()
+    routes = RouteQuery(graph).pareto("Karachi", "Islamabad")
+    offered = sorted((route.distance, route.time, route.cost, tuple(route.edges)) for route in routes)
+    assert offered == [(400, 260, 13000, (slow_cheap, onward)), (800, 110, 4100, (fast_dear, onward))]
+    for route in routes:
+        assert graph.route_totals(route.path, route.edges) == (route.distance, route.time, route.fare)
+
+
+def test_batch_fares_charge_the_flight_route_query_takes():
+    graph = two_carrier_graph()[0]
+    batch = batch_shortest_paths(graph, return_predecessors=True)
+    route = RouteQuery(graph).find_route("Karachi", "Islamabad")
+    row, column = batch.row_of[batch.ids["Karachi"]], batch.ids["Islamabad"]
+    assert batch.fares()[row, column] == route.fare == 13020
+    assert batch.times()[row, column] == route.time
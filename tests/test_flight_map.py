@@ -0,0 +1,53 @@
+import threading
+import time
+
+import pytest
+
+from flight_map import MapLayout
+
+
+def test_concurrent_updates_take_turns(random_graph):
+    graph = random_graph(1, count=10)
+    layout = MapLayout(graph)
+    running, overlaps, calls = [0], [], []
+
+    def place(stale):
+        running[0] += 1
+        overlaps.append(running[0])
+        calls.append(len(stale))
+        time.sleep(0.05)
+        for i, name in enumerate(stale):
+            layout.positions[name] = (float(i), 0.0)
+        running[0] -= 1
+
+    layout.place = place
+    barrier = threading.Barrier(4)
+    results = []
+
+    def draw():
+        barrier.wait()
+        results.append(layout.update())
+
+    threads = [threading.Thread(target=draw) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert overlaps == [1] and calls == [10]
+    assert all(positions == results[0] for positions in results)
+    assert len({id(positions) for positions in results}) == 4
+
+
+def test_only_new_airports_move(random_graph):
+    pytest.importorskip("networkx")
+    graph = random_graph(2, count=15)
+    layout = MapLayout(graph)
+    before = layout.update()
+    assert layout.update() == before and layout.placed == 0
+
+    graph.add_vertex("New")
+    graph.add_edge("New", "A3", 100)
+    after = layout.update()
+    moved = {name for name in before if after[name] != before[name]}
+    assert moved <= {"A3"} and "New" in after
+    assert MapLayout(graph).update().keys() == after.keys()
@@ -0,0 +1,48 @@
+import json
+import time
+
+from flight_core import Passenger, TicketBookingSystem
+from journal import BookingJournal, encode_record
+
+
+def test_trailing_record_is_synced_without_another_append(tmp_path):
+    journal = BookingJournal(str(tmp_path / "bookings.journal"), sync_every=64, sync_interval=0.5)
+    journal.recover()
+    journal.append({"op": "capacity", "total_tickets": 10})
+    journal.append({"op": "cancel", "name": "p1"})
+    assert journal.pending
+
+    deadline = time.monotonic() + 5
+    while journal.pending and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert journal.pending == 0
+    assert journal.syncs == 1
+    journal.close()
+
+
+def history_tickets(system):
+    return [passenger.ticket_number for passenger in system.history.page(0, 100)[0]]
+
+
+def test_repeated_name_survives_snapshot_recovery(tmp_path):
+    snapshotted = str(tmp_path / "snapshotted.journal")
+    plain = str(tmp_path / "plain.journal")
+    systems = [TicketBookingSystem(10, BookingJournal(snapshotted, snapshot_every=4)),
+               TicketBookingSystem(10, BookingJournal(plain, snapshot_every=0))]
+    # The snapshot falls after Ali's second booking has replaced the first in passenger_details.
+    for system in systems:
+        for name in ("Ali", "Sara", "Ali", "Omar"):
+            system.book_tickets(1, [Passenger(name, 30, "0300", "KHI", "LHE")])
+        system.cancel_booking("Sara")
+    expected = history_tickets(systems[0])
+    assert expected == ["Ticket 1", "Ticket 3", "Ticket 4"]
+    states = [json.loads(json.dumps(system.snapshot_state(), default=encode_record)) for system in systems]
+    for system in systems:
+        system.close()
+
+    for path, state in zip((snapshotted, plain), states):
+        recovered = TicketBookingSystem(0, BookingJournal(path))
+        assert history_tickets(recovered) == expected
+        assert sorted(recovered.passenger_records.by_ticket) == expected
+        assert json.loads(json.dumps(recovered.snapshot_state(), default=encode_record)) == state
+        recovered.close()
@@ -0,0 +1,50 @@
+import random
+
+from flight_core import RouteQuery, dijkstra
+from route_cache import RouteCache
+
+
+def test_graph_changes_invalidate_cached_routes(random_graph):
+    rng = random.Random(4)
+    graph = random_graph(4, count=25)
+    cache = graph.enable_route_cache()
+    query = RouteQuery(graph)
+    names = list(graph.vertices)
+
+    for _ in range(30):
+        source, destination = rng.sample(names, 2)
+        first = query.find_route(source, destination)
+        hits = cache.stats()['hits']
+        assert query.find_route(source, destination) is first
+        assert cache.stats()['hits'] == hits + 1
+
+        # Make the cached route dearer; the next answer must be searched again.
+        if len(first.path) > 1:
+            src, dest = first.path[0], first.path[1]
+            graph.update_edge(src, dest, graph.vertices[src][dest] + rng.randint(1, 2000))
+        route = query.find_route(source, destination)
+        assert route is not first
+        assert route.distance == dijkstra(graph, source)[destination]
+
+
+def test_least_recently_used_entries_are_evicted():
+    cache = RouteCache(maxsize=2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1
+    cache.put("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1 and cache.get("c") == 3
+    assert cache.stats()['evictions'] == 1
+
+
+def test_entries_expire_after_ttl(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr("route_cache.time.monotonic", lambda: now[0])
+    cache = RouteCache(ttl=5)
+    cache.put("a", 1)
+    now[0] += 4
+    assert cache.get("a") == 1
+    now[0] += 2
+    assert cache.get("a") is None
+    assert cache.stats()['expirations'] == 1
@@ -0,0 +1,43 @@
+import pytest
+
+from flight_core import dijkstra
+from route_search import astar, bidirectional_dijkstra
+
+STRATEGIES = [astar, bidirectional_dijkstra]
+
+
+def assert_matches_dijkstra(graph, strategy, path_length):
+    for source in graph.vertices:
+        expected = dijkstra(graph, source)
+        for destination in graph.vertices:
+            distance, path, _ = strategy(graph, source, destination)
+            assert distance == expected[destination]
+            if distance == float('inf'):
+                assert path == []
+            else:
+                assert path[0] == source and path[-1] == destination
+                assert path_length(graph, path) == distance
+
+
+@pytest.mark.parametrize("strategy", STRATEGIES)
+def test_bundled_network_matches_dijkstra(network, path_length, strategy):
+    assert_matches_dijkstra(network, strategy, path_length)
+
+
+@pytest.mark.parametrize("strategy", STRATEGIES)
+@pytest.mark.parametrize("directed", [False, True])
+def test_random_networks_match_dijkstra(random_graph, path_length, strategy, directed):
+    # Routes shorter than the great-circle distance shrink the bound but must not break it.
+    graph = random_graph(21, count=30, directed=directed, coordinates=True)
+    graph.add_vertex("LONE", 30.0, 70.0)
+    assert_matches_dijkstra(graph, strategy, path_length)
+
+
+@pytest.mark.parametrize("strategy", STRATEGIES)
+def test_airports_without_coordinates_fall_back_to_dijkstra(random_graph, path_length, strategy):
+    assert_matches_dijkstra(random_graph(22, count=20), strategy, path_length)
+
+
+def test_astar_settles_fewer_airports_than_dijkstra(network):
+    _, _, settled = astar(network, "Karachi", "Islamabad")
+    assert settled < len(network.vertices)
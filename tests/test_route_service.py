@@ -0,0 +1,115 @@
+import asyncio
+import json
+import threading
+import time
+
+import pytest
+
+from route_service import RouteServer, RouteService
+
+
+def closed_out_of_karachi(service, until):
+    profiles = service.graph.enable_time_profiles()
+    for neighbor in service.graph.vertices["Karachi"]:
+        profiles.add_closure("Karachi", neighbor, 0, until)
+
+
+def call(server, target):
+    async def dispatch():
+        try:
+            return await server.dispatch("GET", target, b"")
+        finally:
+            server.close()
+    return asyncio.run(dispatch())
+
+
+@pytest.mark.parametrize("processes", [False, True])
+def test_departure_queries_see_closures_added_after_startup(processes):
+    service = RouteService()
+    server = RouteServer(service, workers=1, processes=processes)
+    closed_out_of_karachi(service, 10000)
+    status, route = call(server, "/route?source=KHI&destination=ISB&departure=0")
+    assert status == 200
+    assert route["arrival"] >= 10000
+    assert route == service.route("KHI", "ISB", departure=0)
+
+
+def test_process_workers_answer_plain_routes():
+    service = RouteService()
+    status, route = call(RouteServer(service, workers=1, processes=True), "/route?source=KHI&destination=ISB")
+    assert status == 200
+    assert route == service.route("KHI", "ISB")
+
+
+def test_locked_calls_do_not_stall_the_event_loop():
+    service = RouteService()
+    server = RouteServer(service, workers=1)
+
+    async def run():
+        # A booking holds the service lock for a while; other connections must still be served.
+        service.lock.acquire()
+        threading.Timer(1, service.lock.release).start()
+        blocked = [asyncio.ensure_future(server.dispatch("GET", target, b""))
+                   for target in ("/availability", "/passengers/Ali")]
+        await asyncio.sleep(0)
+        started = time.monotonic()
+        status, _ = await server.dispatch("GET", "/airports", b"")
+        assert status == 200
+        assert time.monotonic() - started < 0.5
+        assert not any(task.done() for task in blocked)
+        return await asyncio.gather(*blocked)
+
+    try:
+        availability, passenger = asyncio.run(run())
+    finally:
+        server.close()
+    assert availability == (200, {"available": 200, "total": 200})
+    assert passenger[0] == 404
+
+
+def exchange(server, requests):
+    # Sends raw HTTP requests to a running server and returns (status, body) pairs.
+    async def run():
+        listener = await server.start(port=0)
+        port = listener.sockets[0].getsockname()[1]
+        responses = []
+        try:
+            for request in requests:
+                reader, writer = await asyncio.open_connection("127.0.0.1", port)
+                writer.write(request)
+                await writer.drain()
+                head, _, body = (await reader.read()).partition(b"\r\n\r\n")
+                writer.close()
+                responses.append((int(head.split()[1]), json.loads(body)))
+        finally:
+            server.close()
+        return responses
+    return asyncio.run(run())
+
+
+def request(method, target, payload=None):
+    body = json.dumps(payload).encode() if payload is not None else b""
+    return (f"{method} {target} HTTP/1.1\r\nContent-Length: {len(body)}\r\nConnection: close\r\n\r\n"
+            .encode() + body)
+
+
+def test_http_endpoints(network):
+    service = RouteService(network)
+    responses = exchange(RouteServer(service, workers=2), [
+        request("GET", "/route?source=KHI&destination=PEW"),
+        request("GET", "/route?source=KHI&destination=XX"),
+        request("POST", "/bookings", {"source": "KHI", "destination": "ISB", "passengers": [{"name": "Ali"}]}),
+        request("GET", "/passengers/Ali"),
+        request("GET", "/availability"),
+        request("GET", "/nope"),
+        request("POST", "/route"),
+        b"POST /bookings HTTP/1.1\r\nContent-Length: abc\r\n\r\n",
+    ])
+    (status, route), invalid, booked, passenger, availability, missing, wrong_method, malformed = responses
+    expected = network.shortest_path("Karachi", "Peshawar")
+    assert status == 200 and route["distance"] == expected.distance and route["path"] == expected.path
+    assert invalid[0] == 400
+    assert booked == (200, {"booked": True, "waiting_list": [], "available": 199})
+    assert passenger[1]["ticket_number"] == "Ticket 1"
+    assert availability == (200, {"available": 199, "total": 200})
+    assert missing[0] == 404 and wrong_method[0] == 405 and malformed[0] == 400
@@ -0,0 +1,55 @@
+import random
+
+import pytest
+
+from flight_core import dijkstra
+
+
+def assert_table_matches(graph, path_length):
+    table = graph.route_table
+    for source in graph.vertices:
+        expected = dijkstra(graph, source)
+        for destination in graph.vertices:
+            distance, path = table.lookup(source, destination)
+            assert distance == expected[destination]
+            if distance == float('inf'):
+                assert path == []
+            else:
+                assert path[0] == source and path[-1] == destination
+                assert path_length(graph, path) == distance
+
+
+@pytest.mark.parametrize("directed", [False, True])
+@pytest.mark.parametrize("seed", range(3))
+def test_incremental_refresh_matches_dijkstra(random_graph, path_length, seed, directed):
+    rng = random.Random(seed)
+    graph = random_graph(seed, count=20, extra=25, directed=directed)
+    assert graph.enable_route_table()
+    assert_table_matches(graph, path_length)
+
+    for step in range(40):
+        names = list(graph.vertices)
+        action = rng.random()
+        if action < 0.4:
+            src, dest = rng.sample(names, 2)
+            graph.add_edge(src, dest, rng.randint(20, 900))
+        elif action < 0.7:
+            src = rng.choice(names)
+            if graph.vertices[src]:
+                dest = rng.choice(list(graph.vertices[src]))
+                graph.update_edge(src, dest, max(1, graph.vertices[src][dest] + rng.randint(-300, 300)))
+        elif action < 0.9:
+            src = rng.choice(names)
+            if graph.vertices[src]:
+                graph.remove_edge(src, rng.choice(list(graph.vertices[src])))
+        else:
+            # A new airport, or an existing one added again, which clears its routes.
+            graph.add_vertex(f"N{step}" if rng.random() < 0.5 else rng.choice(names))
+        assert_table_matches(graph, path_length)
+
+
+def test_table_is_dropped_above_its_limit(random_graph):
+    graph = random_graph(0, count=10)
+    assert graph.enable_route_table(max_vertices=10)
+    graph.add_vertex("extra")
+    assert graph.route_table is None
@@ -0,0 +1,126 @@
+import random
+
+import pytest
+
+from flight_core import RouteQuery
+from time_profiles import INF, EdgeProfiles, time_dependent_path
+
+
+class Timetable:
+    # The same profiles and closures kept as plain lists: closures stay
+    # unmerged and flight times are interpolated by a linear scan.
+    def __init__(self, graph):
+        self.graph = graph
+        self.profiles = {}
+        self.closures = {}
+
+    def directions(self, src, dest):
+        return [(src, dest)] if self.graph.directed else [(src, dest), (dest, src)]
+
+    def flight_time(self, src, dest, departure):
+        if (src, dest) not in self.profiles:
+            return self.graph.edge_metrics[(src, dest)][0]
+        points = self.profiles[(src, dest)]
+        if departure <= points[0][0]:
+            return points[0][1]
+        for (t0, m0), (t1, m1) in zip(points, points[1:]):
+            if departure < t1:
+                return m0 + (m1 - m0) * (departure - t0) / (t1 - t0)
+        return points[-1][1]
+
+    def arrival(self, path, departure):
+        time = departure
+        for src, dest in zip(path, path[1:]):
+            moved = True
+            while moved:
+                moved = False
+                for start, end in self.closures.get((src, dest), ()):
+                    if start <= time < end:
+                        time, moved = end, True
+            if time == INF:
+                return INF
+            time += self.flight_time(src, dest, time)
+        return time
+
+
+def random_restrictions(graph, seed):
+    rng = random.Random(seed)
+    profiles, timetable = EdgeProfiles(graph), Timetable(graph)
+    edges = [(src, dest) for src in graph.vertices for dest in graph.vertices[src]]
+    for src, dest in rng.sample(edges, len(edges) // 2):
+        # Each step may shorten the flight by at most the time waited, which keeps it FIFO.
+        times, minutes = [rng.uniform(0, 60)], [rng.uniform(30, 200)]
+        for _ in range(rng.randint(0, 4)):
+            step = rng.uniform(5, 120)
+            times.append(times[-1] + step)
+            minutes.append(max(1, minutes[-1] + rng.uniform(-step, step)))
+        profiles.set_profile(src, dest, times, minutes)
+        for edge in timetable.directions(src, dest):
+            timetable.profiles[edge] = list(zip(times, minutes))
+    for src, dest in rng.sample(edges, len(edges) // 3):
+        for _ in range(rng.randint(1, 3)):
+            start = rng.uniform(0, 600)
+            end = INF if rng.random() < 0.1 else start + rng.uniform(10, 300)
+            profiles.add_closure(src, dest, start, end)
+            for edge in timetable.directions(src, dest):
+                timetable.closures.setdefault(edge, []).append((start, end))
+    return profiles, timetable
+
+
+@pytest.mark.parametrize("seed", range(6))
+@pytest.mark.parametrize("directed", [False, True])
+def test_earliest_arrival_matches_every_simple_path(random_graph, simple_paths, seed, directed):
+    graph = random_graph(seed, count=7, extra=6, directed=directed, metrics=True)
+    profiles, timetable = random_restrictions(graph, seed)
+    rng = random.Random(seed)
+    for source in graph.vertices:
+        destination = rng.choice(list(graph.vertices))
+        departure = rng.uniform(0, 500)
+        arrival, path, _ = time_dependent_path(graph, profiles, source, destination, departure)
+        best = min(timetable.arrival(candidate, departure)
+                   for candidate in simple_paths(graph, source, destination))
+        assert arrival == pytest.approx(best)
+        if arrival == INF:
+            assert path == []
+        else:
+            assert path[0] == source and path[-1] == destination
+            assert timetable.arrival(path, departure) == pytest.approx(arrival)
+
+
+def test_static_times_match_the_fastest_route(random_graph):
+    graph = random_graph(11, metrics=True)
+    query = RouteQuery(graph)
+    for destination in ("A4", "A17", "A29"):
+        arrival, path, _ = time_dependent_path(graph, None, "A0", destination, 100)
+        assert arrival - 100 == query.find_route("A0", destination, metric="time").time
+
+
+def test_profiles_must_be_fifo(network):
+    profiles = EdgeProfiles(network)
+    with pytest.raises(ValueError):
+        profiles.set_profile("Lahore", "Gujranwala", [0, 10], [60, 40])
+    profiles.set_profile("Lahore", "Gujranwala", [0, 10], [60, 50])
+    with pytest.raises(ValueError):
+        profiles.add_closure("Lahore", "Gujranwala", 20, 20)
+
+
+def test_closures_merge_and_expire(network):
+    profiles = EdgeProfiles(network)
+    for start, end in [(100, 200), (300, 400), (150, 320), (500, 600)]:
+        profiles.add_closure("Lahore", "Gujranwala", start, end)
+    assert list(profiles.closures[("Lahore", "Gujranwala")]) == [100, 400, 500, 600]
+    assert list(profiles.closures[("Gujranwala", "Lahore")]) == [100, 400, 500, 600]
+    profiles.expire(450)
+    assert list(profiles.closures[("Lahore", "Gujranwala")]) == [500, 600]
+    profiles.expire(600)
+    assert ("Lahore", "Gujranwala") not in profiles.closures
+
+
+def test_find_route_at_waits_out_closures(network):
+    # With every flight out of Lahore closed, the best plan is to wait.
+    profiles = network.enable_time_profiles()
+    for dest in network.vertices["Lahore"]:
+        profiles.add_closure("Lahore", dest, 0, 10000, both_directions=False)
+    query = RouteQuery(network)
+    route = query.find_route_at("Lahore", "Islamabad", 50)
+    assert route.arrival == 10000 + query.find_route("Lahore", "Islamabad", metric="time").time
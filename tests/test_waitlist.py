@@ -0,0 +1,53 @@
+import random
+
+import pytest
+
+from flight_core import Passenger
+from waitlist import Waitlist
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_promotion_matches_a_sorted_queue(seed):
+    # The reference keeps (tier, arrival, name) in a plain list and promotes
+    # the smallest entries the filter accepts.
+    rng = random.Random(seed)
+    waitlist = Waitlist()
+    reference = []
+    arrivals = 0
+    for step in range(400):
+        flight = rng.choice(["PK301", "PK302"])
+        action = rng.random()
+        if action < 0.5:
+            arrivals += 1
+            name = f"p{arrivals}"
+            tier = rng.randrange(waitlist.tiers)
+            waitlist.add(flight, Passenger(name, 30, "0300", "KHI", "LHE"), tier)
+            reference.append((flight, tier, arrivals, name))
+        elif action < 0.65:
+            waiting = [entry for entry in reference if entry[0] == flight]
+            if waiting:
+                entry = rng.choice(waiting)
+                assert waitlist.remove(flight, entry[3])
+                reference.remove(entry)
+            assert not waitlist.remove(flight, "nobody")
+        else:
+            seats = rng.randint(1, 4)
+            odd_only = rng.random() < 0.3
+            eligible = (lambda passenger: int(passenger.name[1:]) % 2 == 1) if odd_only else None
+            expected = [entry for entry in sorted(entry for entry in reference if entry[0] == flight)
+                        if not odd_only or entry[2] % 2 == 1][:seats]
+            promoted = waitlist.promote(flight, seats, eligible)
+            assert [passenger.name for passenger in promoted] == [entry[3] for entry in expected]
+            for entry in expected:
+                reference.remove(entry)
+
+        for name in ("PK301", "PK302"):
+            waiting = sorted(entry for entry in reference if entry[0] == name)
+            assert waitlist.size(name) == len(waiting)
+            assert [(tier, passenger.name) for tier, passenger in waitlist.tiered(name)] == \
+                [(entry[1], entry[3]) for entry in waiting]
+
+
+def test_unknown_tier_is_rejected():
+    with pytest.raises(ValueError):
+        Waitlist().add("PK301", Passenger("p", 30, "0300", "KHI", "LHE"), tier=5)
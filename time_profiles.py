@@ -0,0 +1,144 @@
+from array import array
+from bisect import bisect_right
+import heapq
+
+from fares import MINUTES_PER_LEG
+from route_search import reconstruct_path
+
+INF = float('inf')
+
+
+class EdgeProfiles:
+    # Departure-time-dependent flight times for directed edges, in minutes on
+    # a shared clock. A profile is two parallel arrays, breakpoints and flight
+    # times, interpolated linearly and held flat outside the breakpoints.
+    # Closures (weather, airspace) are merged [start, end) windows kept in one
+    # flat array per edge; a flight due to leave inside one waits for it to end.
+    # Every profile must be FIFO (leaving later never lands earlier), which
+    # is what keeps the time-dependent search exact.
+    def __init__(self, graph):
+        self.graph = graph
+        self.profiles = {}
+        self.closures = {}
+        self.version = 0
+
+    def _edges(self, src, dest, both_directions):
+        if dest not in self.graph.vertices.get(src, {}):
+            raise ValueError(f"No route from {src} to {dest}")
+        if both_directions and not self.graph.directed:
+            return (src, dest), (dest, src)
+        return (src, dest),
+
+    def set_profile(self, src, dest, times, minutes, both_directions=True):
+        times = array('d', times)
+        minutes = array('d', minutes)
+        if not times or len(times) != len(minutes):
+            raise ValueError("A profile needs the same, non-zero number of times and flight times")
+        for i in range(1, len(times)):
+            if times[i] <= times[i - 1]:
+                raise ValueError("Profile times must be strictly increasing")
+            if times[i] + minutes[i] < times[i - 1] + minutes[i - 1]:
+                raise ValueError(f"Leaving at {times[i]} would land before leaving at {times[i - 1]}")
+        if min(minutes) < 0:
+            raise ValueError("Flight times cannot be negative")
+
+        for edge in self._edges(src, dest, both_directions):
+            self.profiles[edge] = (times, minutes)
+        self.version += 1
+
+    def clear_profile(self, src, dest, both_directions=True):
+        for edge in self._edges(src, dest, both_directions):
+            self.profiles.pop(edge, None)
+        self.version += 1
+
+    def add_closure(self, src, dest, start, end=INF, both_directions=True):
+        if end <= start:
+            raise ValueError("A closure must end after it starts")
+        for edge in self._edges(src, dest, both_directions):
+            windows = self.closures.get(edge, array('d'))
+            # Windows overlapping the new one are folded into it.
+            first = bisect_right(windows, start)
+            if first % 2:
+                first -= 1
+                start = windows[first]
+            last = bisect_right(windows, end)
+            if last % 2:
+                end = windows[last]
+                last += 1
+            self.closures[edge] = windows[:first] + array('d', (start, end)) + windows[last:]
+        self.version += 1
+
+    def clear_closures(self, src, dest, both_directions=True):
+        for edge in self._edges(src, dest, both_directions):
+            self.closures.pop(edge, None)
+        self.version += 1
+
+    def expire(self, now):
+        # Drops closure windows that ended at or before now.
+        for edge, windows in list(self.closures.items()):
+            first = bisect_right(windows, now)
+            first -= first % 2
+            if first:
+                if first == len(windows):
+                    del self.closures[edge]
+                else:
+                    self.closures[edge] = windows[first:]
+        self.version += 1
+
+    def flight_time(self, src, dest, departure):
+        profile = self.profiles.get((src, dest))
+        if profile is None:
+            return self.graph.edge_metrics.get((src, dest), (MINUTES_PER_LEG,))[0]
+        times, minutes = profile
+        i = bisect_right(times, departure)
+        if i == 0:
+            return minutes[0]
+        if i == len(times):
+            return minutes[-1]
+        t0, t1 = times[i - 1], times[i]
+        return minutes[i - 1] + (minutes[i] - minutes[i - 1]) * (departure - t0) / (t1 - t0)
+
+    def arrival(self, src, dest, departure):
+        windows = self.closures.get((src, dest))
+        if windows:
+            i = bisect_right(windows, departure)
+            if i % 2:
+                departure = windows[i]
+                if departure == INF:
+                    return INF
+        return departure + self.flight_time(src, dest, departure)
+
+
+def time_dependent_path(graph, profiles, source, destination, departure):
+    # Dijkstra on arrival time. Returns (arrival, path, settled); without
+    # profiles every leg takes its static time.
+    if source not in graph.vertices or destination not in graph.vertices:
+        return INF, [], 0
+    if profiles is None:
+        profiles = EdgeProfiles(graph)
+
+    arrivals = {source: departure}
+    previous = {}
+    settled = set()
+    priority_queue = [(departure, source)]
+
+    while priority_queue:
+        current_time, current_vertex = heapq.heappop(priority_queue)
+
+        if current_vertex in settled:
+            continue
+        settled.add(current_vertex)
+
+        if current_vertex == destination:
+            return current_time, reconstruct_path(previous, source, destination), len(settled)
+
+        for neighbor in graph.vertices[current_vertex]:
+            if neighbor in settled:
+                continue
+            arrival = profiles.arrival(current_vertex, neighbor, current_time)
+            if arrival < arrivals.get(neighbor, INF):
+                arrivals[neighbor] = arrival
+                previous[neighbor] = current_vertex
+                heapq.heappush(priority_queue, (arrival, neighbor))
+
+    return INF, [], len(settled)
@@ -0,0 +1,93 @@
+from collections import deque
+from itertools import count
+
+TIER_PRIORITY = 0
+TIER_STANDARD = 1
+TIER_STANDBY = 2
+DEFAULT_TIERS = 3
+
+
+class Waitlist:
+    # One deque per priority tier for each flight. Promotion pops from the
+    # front of the highest non-empty tier, so promoting k passengers is O(k)
+    # however long the queues are. Removals are lazy: the entry is skipped
+    # when promotion reaches it.
+    def __init__(self, tiers=DEFAULT_TIERS):
+        self.tiers = tiers
+        self.queues = {}
+        self.sizes = {}
+        self.entries = {}
+        self.removed = set()
+        self.entry_ids = count(1)
+
+    def _queues_for(self, flight):
+        queues = self.queues.get(flight)
+        if queues is None:
+            queues = self.queues[flight] = [deque() for _ in range(self.tiers)]
+            self.sizes[flight] = 0
+        return queues
+
+    def add(self, flight, passenger, tier=TIER_STANDARD):
+        if not 0 <= tier < self.tiers:
+            raise ValueError(f"Waitlist tier must be between 0 and {self.tiers - 1}")
+        entry_id = next(self.entry_ids)
+        self._queues_for(flight)[tier].append((entry_id, passenger))
+        self.entries[(flight, passenger.name)] = entry_id
+        self.sizes[flight] += 1
+        return entry_id
+
+    def extend(self, flight, passengers, tier=TIER_STANDARD):
+        for passenger in passengers:
+            self.add(flight, passenger, tier)
+
+    def remove(self, flight, passenger_name):
+        entry_id = self.entries.pop((flight, passenger_name), None)
+        if entry_id is None:
+            return False
+        self.removed.add(entry_id)
+        self.sizes[flight] -= 1
+        return True
+
+    def promote(self, flight, seats, eligible=None):
+        # eligible, if given, is asked about each passenger in turn; those it
+        # turns down keep their place in the queue.
+        promoted = []
+        queues = self.queues.get(flight)
+        if not queues:
+            return promoted
+
+        for queue in queues:
+            skipped = []
+            while queue and len(promoted) < seats:
+                entry_id, passenger = queue.popleft()
+                if entry_id in self.removed:
+                    self.removed.discard(entry_id)
+                    continue
+                if eligible is not None and not eligible(passenger):
+                    skipped.append((entry_id, passenger))
+                    continue
+                if self.entries.get((flight, passenger.name)) == entry_id:
+                    del self.entries[(flight, passenger.name)]
+                promoted.append(passenger)
+            queue.extendleft(reversed(skipped))
+            if len(promoted) == seats:
+                break
+
+        self.sizes[flight] -= len(promoted)
+        return promoted
+
+    def size(self, flight):
+        return self.sizes.get(flight, 0)
+
+    def waiting(self, flight):
+        for _, passenger in self.tiered(flight):
+            yield passenger
+
+    def tiered(self, flight):
+        for tier, queue in enumerate(self.queues.get(flight, ())):
+            for entry_id, passenger in queue:
+                if entry_id not in self.removed:
+                    yield tier, passenger
+
+    def flights(self):
+        return [flight for flight, size in self.sizes.items() if size]